@@ -354,27 +354,27 @@ COMMON MCP SERVERS (run with windows run_command "uvx <server>"):
             try:
                 async for response in self.gemini_client.receive_responses():
                     # Queue audio for playback (non-blocking)
-                    if 'audio' in response:
-                        await self.audio_out_queue.put(response['audio'])
+                    if response.audio is not None:
+                        await self.audio_out_queue.put(response.audio)
                         
                         # Also stream to Discord voice if connected
-                        await self._stream_to_discord(response['audio'])
+                        await self._stream_to_discord(response.audio)
                     
                     # Capture user transcription if available
-                    if 'user_transcription' in response:
-                        self._current_user_input = response['user_transcription']
+                    if response.user_transcription is not None:
+                        self._current_user_input = response.user_transcription
                         logging.debug(f"User said: {self._current_user_input}")
                     
                     # Display text response and record exchange
-                    if 'text' in response:
-                        print(f"💋 Sakura: {response['text']}")
+                    if response.text is not None:
+                        print(f"💋 Sakura: {response.text}")
                         
                         # Record exchange to conversation context
                         # Use captured transcription or a placeholder
                         user_input = self._current_user_input if self._current_user_input else "[voice input]"
                         await self.conversation_context.add_exchange(
                             user_input=user_input,
-                            ai_response=response['text'],
+                            ai_response=response.text,
                             tools_used=self._current_tools_used.copy() if self._current_tools_used else None
                         )
                         # Reset tracking for next exchange
@@ -382,7 +382,7 @@ COMMON MCP SERVERS (run with windows run_command "uvx <server>"):
                         self._current_tools_used = []
                     
                     # Handle interruption - clear audio queue
-                    if response.get('interrupted'):
+                    if response.interrupted:
                         while not self.audio_out_queue.empty():
                             try:
                                 self.audio_out_queue.get_nowait()
@@ -390,15 +390,15 @@ COMMON MCP SERVERS (run with windows run_command "uvx <server>"):
                                 break
                     
                     # Handle session resumption
-                    if 'session_handle' in response:
+                    if response.session_handle is not None:
                         await self.session_manager.save_session_handle(
-                            response['session_handle'],
+                            response.session_handle,
                             {"voice": self.config.voice.voice_name}
                         )
                     
                     # Handle function calls (if implemented)
-                    if 'function_calls' in response:
-                        await self._handle_function_calls(response['function_calls'])
+                    if response.function_calls:
+                        await self._handle_function_calls(response.function_calls)
                 
             except Exception as e:
                 logging.error(f"Error handling responses: {e}")
@@ -650,6 +650,10 @@ COMMON MCP SERVERS (run with windows run_command "uvx <server>"):
         if self.intent_parser:
             await self.intent_parser.cleanup()
         
+        # Flush pending session writes
+        if self.session_manager:
+            await self.session_manager.cleanup()
+        
         # Cleanup background task manager
         if self.background_task_manager:
             await self.background_task_manager.cleanup()
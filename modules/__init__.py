@@ -4,16 +4,15 @@ AI Girlfriend Voice Chat - Modules Package
 
 # Core modules
 from .config import AppConfig, VoiceConfig, WakeWordConfig, GeminiConfig
+from . import persona as _persona
 from .persona import (
     get_current_persona, get_wake_responses, get_goodbye_responses,
-    PersonalityMode, PERSONAS, CURRENT_PERSONALITY,
-    # Backwards compatibility
-    FLIRTY_GIRLFRIEND_PERSONA, WAKE_UP_RESPONSES_LIST, GOODBYE_RESPONSES_LIST
+    get_persona_entry, PersonaEntry, pick_wake_response, pick_goodbye_response, PersonalityMode, PERSONAS, CURRENT_PERSONALITY,
 )
 from .audio_manager import AudioManager
 from .wake_word_detector import WakeWordDetector
 from .session_manager import SessionManager
-from .gemini_client import GeminiVoiceClient
+from .gemini_client import GeminiVoiceClient, GeminiChunk
 from .api_key_manager import APIKeyManager, APIKey, KeyStatus
 from .async_config_loader import AsyncConfigLoader
 from .async_utils import AsyncFileManager, AsyncLogger, AsyncBackupManager
@@ -38,11 +37,11 @@ __all__ = [
     
     # Persona
     'get_current_persona', 'get_wake_responses', 'get_goodbye_responses',
-    'PersonalityMode', 'PERSONAS', 'CURRENT_PERSONALITY',
+    'get_persona_entry', 'PersonaEntry', 'pick_wake_response', 'pick_goodbye_response', 'PersonalityMode', 'PERSONAS', 'CURRENT_PERSONALITY',
     'FLIRTY_GIRLFRIEND_PERSONA', 'WAKE_UP_RESPONSES_LIST', 'GOODBYE_RESPONSES_LIST',
     
     # Core components
-    'AudioManager', 'WakeWordDetector', 'SessionManager', 'GeminiVoiceClient',
+    'AudioManager', 'WakeWordDetector', 'SessionManager', 'GeminiVoiceClient', 'GeminiChunk',
     
     # API management
     'APIKeyManager', 'APIKey', 'KeyStatus',
@@ -69,4 +68,13 @@ __all__ = [
     
     # Background Tasks
     'BackgroundTaskManager', 'BackgroundTask', 'TaskState'
-]
\ No newline at end of file
+]
+
+# Backwards compatibility - forwarded to persona's lazy aliases so importing
+# the package doesn't build them
+_PERSONA_COMPAT = ('FLIRTY_GIRLFRIEND_PERSONA', 'WAKE_UP_RESPONSES_LIST', 'GOODBYE_RESPONSES_LIST')
+
+def __getattr__(name: str):
+    if name in _PERSONA_COMPAT:
+        return getattr(_persona, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
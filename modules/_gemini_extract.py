@@ -0,0 +1,112 @@
+"""
+Per-chunk response extraction for the Gemini Live stream
+Kept synchronous and free of closures so it can be compiled with mypyc
+(`mypyc modules/_gemini_extract.py`); the pure-Python module is used otherwise
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+_log = logging.getLogger(__name__)
+
+@dataclass(slots=True)
+class GeminiChunk:
+    """One streamed response from the Live API, reduced to the fields Sakura uses"""
+    audio: Optional[bytes] = None
+    text: Optional[str] = None
+    function_calls: Optional[List[Any]] = None
+    interrupted: bool = False
+    turn_complete: bool = False
+    session_handle: Optional[str] = None
+    user_transcription: Optional[Any] = None
+
+def extract_response(response: Any) -> Optional[GeminiChunk]:
+    """Pull audio/text/tool calls/transcription/handle out of one streamed response
+    
+    Returns None when the response carries nothing of interest.
+    """
+    server_content = getattr(response, 'server_content', None)
+    
+    # Handle interruption
+    if server_content is not None and server_content.interrupted:
+        return GeminiChunk(interrupted=True)
+    
+    # Fast path: one audio part and nothing else - the dominant chunk shape in a voice session
+    if server_content is not None:
+        model_turn = server_content.model_turn
+        parts = model_turn.parts if model_turn else None
+        if (parts and len(parts) == 1
+                and not getattr(server_content, 'turn_complete', None)
+                and not getattr(server_content, 'input_transcription', None)
+                and not getattr(response, 'tool_call', None)
+                and not getattr(response, 'session_resumption_update', None)):
+            part = parts[0]
+            inline_data = part.inline_data
+            if (inline_data and inline_data.data
+                    and not getattr(part, 'text', None) and not getattr(part, 'function_call', None)):
+                return GeminiChunk(audio=inline_data.data)
+    
+    audio = None
+    text = None
+    user_transcription = None
+    turn_complete = False
+    session_handle = None
+    
+    # Handle function calls from multiple possible locations
+    function_calls_found: List[Any] = []
+    
+    # Check response.tool_call (old SDK format)
+    tool_call = getattr(response, 'tool_call', None)
+    if tool_call:
+        function_calls = getattr(tool_call, 'function_calls', None)
+        if function_calls is not None:
+            function_calls_found.extend(function_calls)
+            if _log.isEnabledFor(logging.INFO):
+                _log.info("🔧 Function calls in tool_call: %d", len(function_calls))
+    
+    if server_content is not None:
+        # Check server_content.model_turn.parts for function calls (Live API format)
+        model_turn = server_content.model_turn
+        if model_turn:
+            for part in model_turn.parts:
+                # Extract audio
+                inline_data = part.inline_data
+                if inline_data and inline_data.data:
+                    audio = inline_data.data
+                # Extract text
+                part_text = getattr(part, 'text', None)
+                if part_text:
+                    text = part_text
+                # Extract function calls
+                function_call = getattr(part, 'function_call', None)
+                if function_call:
+                    function_calls_found.append(function_call)
+                    if _log.isEnabledFor(logging.INFO):
+                        _log.info("🔧 Function call in model_turn.parts: %s", getattr(function_call, 'name', 'unknown'))
+        
+        # Handle user transcription if available (input_transcription)
+        user_transcription = getattr(server_content, 'input_transcription', None) or None
+        # Also check for turn_complete which may have transcription
+        turn_complete = bool(getattr(server_content, 'turn_complete', None))
+    
+    if function_calls_found:
+        if _log.isEnabledFor(logging.INFO):
+            _log.info("✨ Total function calls found: %d", len(function_calls_found))
+    
+    # Handle session resumption updates
+    resumption = getattr(response, 'session_resumption_update', None)
+    if resumption and getattr(resumption, 'resumable', None):
+        session_handle = resumption.new_handle
+    
+    if (audio is None and text is None and not function_calls_found and user_transcription is None
+            and not turn_complete and session_handle is None):
+        return None
+    
+    return GeminiChunk(
+        audio=audio,
+        text=text,
+        function_calls=function_calls_found or None,
+        turn_complete=turn_complete,
+        session_handle=session_handle,
+        user_transcription=user_transcription,
+    )
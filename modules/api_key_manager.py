@@ -194,6 +194,27 @@ class APIKeyManager:
             logging.error("No available API keys")
             return None
     
+    async def get_available_keys(self, limit: Optional[int] = None) -> List[APIKey]:
+        """Get available keys in rotation order, starting from the current key"""
+        async with self._lock:
+            available = []
+            for offset in range(len(self.keys)):
+                key = self.keys[(self.current_key_index + offset) % len(self.keys)]
+                if await self._is_key_available(key):
+                    available.append(key)
+                    if limit and len(available) >= limit:
+                        break
+            return available
+    
+    async def select_key(self, key: APIKey) -> bool:
+        """Make the given key the current key"""
+        async with self._lock:
+            for i, k in enumerate(self.keys):
+                if k is key:
+                    self.current_key_index = i
+                    return True
+            return False
+    
     async def _is_key_available(self, key: APIKey) -> bool:
         """Check if a key is available for use"""
         now = datetime.now()
@@ -1,32 +1,100 @@
+import re
+import time
+import functools
 import asyncio
 import logging
+from collections import deque
 from typing import Optional, AsyncGenerator, Dict, Any, List
 from google import genai
-import random
-from datetime import datetime, timedelta
-from .persona import get_goodbye_responses
+from google.genai import types
+from .persona import pick_goodbye_response
 from .api_key_manager import APIKeyManager, KeyStatus
+from ._gemini_extract import GeminiChunk, extract_response
+
+_log = logging.getLogger(__name__)
+
+# Error classes in priority order, each compiled once from its keyword list
+_ERROR_PATTERNS = [
+    # Rate limiting / quota exhaustion
+    ("rate_limited", re.compile("|".join(map(re.escape, [
+        "rate limit", "quota", "resource_exhausted", "exhausted",
+        "429", "too many requests", "exceeded"
+    ])))),
+    # Invalid/unauthorized keys
+    ("invalid_key", re.compile("|".join(map(re.escape, [
+        "unauthorized", "api_key", "permission denied",
+        "403", "401", "invalid api key"
+    ])))),
+    # Temporary/retriable errors (not key issues)
+    ("temporary", re.compile("|".join(map(re.escape, [
+        "timeout", "connection", "network", "unavailable",
+        "503", "502", "500", "internal"
+    ])))),
+]
+
+@functools.lru_cache(maxsize=128)
+def _classify(error_msg: str) -> Optional[str]:
+    """Map a lowercased error message to its error class (cached for repeat storms)"""
+    for error_class, pattern in _ERROR_PATTERNS:
+        if pattern.search(error_msg):
+            return error_class
+    return None
+
+def _classify_error(error: Exception) -> Optional[str]:
+    if isinstance(error, TimeoutError):
+        return "temporary"
+    # Whole message - a marker past any cutoff must still classify; the cache size bounds memory
+    return _classify(str(error).lower())
 
 class GeminiVoiceClient:
     """Handles Gemini Live API interactions with automatic key rotation"""
     
+    _PCM_MIME = "audio/pcm"
+    _AUDIO_RING_SIZE = 32  # Frames buffered before the oldest is dropped
+    _CONNECT_RACE_KEYS = 3  # Keys raced in parallel on the first connect attempt
+    _SEND_TIMEOUT = 2.0  # Seconds before a hung send trips the error/reconnect path
+    _CONNECT_TIMEOUT = 10.0  # Seconds allowed for the live session handshake
+    _ERR_SCORE_DECAY = 0.9
+    _ERR_SCORE_MAX = 10.0
+    _ERR_SCORE_TRIP = 5.0  # Score at which the circuit opens and we reconnect
+    
     def __init__(self, model: str, voice_name: str = "Aoede"):
         self.model = model
         self.voice_name = voice_name
         self.client = None
+        self._clients: Dict[str, genai.Client] = {}  # One warm client per key name
         self.session = None
         self._session_context = None
-        self.is_connected = False
+        self._connected_event = asyncio.Event()  # Set while connected; backs is_connected
+        self._reconnect_task: Optional[asyncio.Task] = None
         self.key_manager = APIKeyManager()
         self.current_key = None
         self.tools = []  # Tool declarations for function calling
+        self._compiled_tools: List[Any] = []  # SDK Tool objects built once per tools change
         self._system_prompt = ""  # Store for reconnection
-        self._last_activity = datetime.now()
-        self._connection_check_interval = timedelta(seconds=30)
+        self._last_activity = time.monotonic()
+        self._connection_check_interval_s = 30.0
         self._reconnect_lock = asyncio.Lock()
-        self._consecutive_errors = 0
-        self._max_consecutive_errors = 10
+        self._err_score = 0.0  # Exponentially decaying error score (EWMA, decay 0.9)
+        self._cached_config: Optional[Dict[str, Any]] = None  # Reused across reconnects
+        self._audio_ring: deque = deque(maxlen=self._AUDIO_RING_SIZE)
+        self._audio_ready = asyncio.Event()
+        self._sender_task: Optional[asyncio.Task] = None
+        self._watchdog_task: Optional[asyncio.Task] = None
+        self._healthy = False  # Maintained by the watchdog
+        self._last_handle: Optional[str] = None  # Most recent resumable session handle
         
+    @property
+    def is_connected(self) -> bool:
+        return self._connected_event.is_set()
+    
+    @is_connected.setter
+    def is_connected(self, value: bool):
+        if value:
+            self._connected_event.set()
+        else:
+            self._connected_event.clear()
+    
     async def initialize(self, system_prompt: str, resume_handle: Optional[str] = None, 
                          tools: Optional[List[Dict[str, Any]]] = None):
         """Initialize Gemini client and session with key rotation and tools"""
@@ -34,6 +102,7 @@ class GeminiVoiceClient:
             # Store for reconnection
             self._system_prompt = system_prompt
             self.tools = tools or []
+            self._compiled_tools = self._compile_tools(self.tools)
             
             # Load API keys
             await self.key_manager.load_keys()
@@ -41,95 +110,129 @@ class GeminiVoiceClient:
             # Get current key
             self.current_key = await self.key_manager.get_current_key()
             if not self.current_key:
-                logging.error("No available API keys")
+                _log.error("No available API keys")
                 return False
             
             # Configure Gemini with current key (new SDK uses Client directly)
-            self.client = genai.Client(api_key=self.current_key.key)
+            self.client = self._get_client(self.current_key)
             
-            logging.info(f"Using API key: {self.current_key.name}")
+            _log.info("Using API key: %s", self.current_key.name)
             
-            # Configure for voice interaction - use simple dict format per official docs
-            config = {
-                "response_modalities": ["AUDIO"],
-                "system_instruction": system_prompt,
-                "speech_config": {
-                    "voice_config": {
-                        "prebuilt_voice_config": {
-                            "voice_name": self.voice_name
-                        }
-                    }
-                }
-            }
-            
-            # Add tools for function calling if provided
+            # Build the base config once; reconnects reuse it
+            self._invalidate_config()
+            config = self._get_config()
             if self.tools:
-                config["tools"] = [{"function_declarations": self.tools}]
-                logging.info(f"Registered {len(self.tools)} tools with Gemini")
+                _log.info("Registered %d tools with Gemini", len(self.tools))
+            
+            # Reconnects resume from here; persisting across restarts is SessionManager's job
+            self._last_handle = resume_handle
             
             # Only add session resumption if we have a handle
             if resume_handle:
-                config["session_resumption"] = {"handle": resume_handle}
+                config = {**config, "session_resumption": {"handle": resume_handle}}
             
             # Connect to live session
-            self.session = await self._connect_with_retry(config)
+            self.session = await self._connect_with_retry(config, race=True)
             if not self.session:
                 return False
             
             self.is_connected = True
+            self._start_background_tasks()
             await self.key_manager.mark_key_used(self.current_key, success=True)
-            logging.info(f"Gemini client initialized with voice: {self.voice_name}")
+            _log.info("Gemini client initialized with voice: %s", self.voice_name)
             
             return True
             
         except Exception as e:
-            logging.error(f"Failed to initialize Gemini client: {e}")
+            _log.error("Failed to initialize Gemini client: %s", e)
             if self.current_key:
                 await self.key_manager.mark_key_used(self.current_key, success=False)
             return False
     
     async def send_audio(self, audio_data: bytes):
-        """Send audio data to Gemini with error handling and connection monitoring"""
-        if not self.is_connected or not self.session:
+        """Buffer audio data for the batched sender with connection monitoring"""
+        if not self._connected_event.is_set() or not self.session:
             # Try to reconnect if disconnected
-            if await self._auto_reconnect():
-                logging.info("🔄 Auto-reconnected, resuming audio stream")
+            if await self._ensure_connected():
+                _log.info("🔄 Auto-reconnected, resuming audio stream")
             else:
                 return
+        
+        # Never blocks capture: a full ring silently drops its stalest frame
+        self._audio_ring.append(audio_data)
+        self._audio_ready.set()
+    
+    def _start_background_tasks(self):
+        """Start the audio sender and connection watchdog if not already running"""
+        self._healthy = True
+        if self._sender_task is None or self._sender_task.done():
+            self._sender_task = asyncio.create_task(self._audio_sender_loop())
+        if self._watchdog_task is None or self._watchdog_task.done():
+            self._watchdog_task = asyncio.create_task(self._watchdog())
+    
+    async def _audio_sender_loop(self):
+        """Drain buffered audio frames, coalescing everything pending into one send"""
+        ring = self._audio_ring
+        ready = self._audio_ready
+        while True:
+            await ready.wait()
+            ready.clear()
+            if not ring:
+                continue
+            if len(ring) == 1:
+                chunk = ring.popleft()
+            else:
+                chunk = b"".join(ring)
+                ring.clear()
             
-        try:
-            # Send as realtime input with proper format
-            await self.session.send_realtime_input(
-                audio={"data": audio_data, "mime_type": "audio/pcm"}
-            )
-            self._update_activity()
-            self._consecutive_errors = 0
-        except Exception as e:
-            self._consecutive_errors += 1
-            logging.error(f"Error sending audio (attempt {self._consecutive_errors}): {e}")
+            if not self.is_connected or not self.session:
+                continue
             
-            if self._consecutive_errors >= self._max_consecutive_errors:
-                logging.warning("🔄 Too many consecutive errors, attempting reconnect...")
-                await self._auto_reconnect()
-            else:
-                await self._handle_api_error(e)
+            try:
+                # Send as realtime input with proper format
+                async with asyncio.timeout(self._SEND_TIMEOUT):
+                    await self.session.send_realtime_input(
+                        audio={"data": chunk, "mime_type": self._PCM_MIME}
+                    )
+                self._update_activity()
+                self._record_success()
+            except Exception as e:
+                self._record_error()
+                _log.error("Error sending audio (error score %.1f): %s", self._err_score, e)
+                
+                # Recovery failing must not end the sender - capture keeps filling the ring
+                try:
+                    # A hung send means the socket is gone - reconnect right away
+                    if isinstance(e, TimeoutError) or self._err_score >= self._ERR_SCORE_TRIP:
+                        _log.warning("🔄 Send timed out or error rate too high, attempting reconnect...")
+                        self.is_connected = False
+                        await self._ensure_connected()
+                    else:
+                        await self._handle_api_error(e)
+                except Exception as recovery_error:
+                    _log.error("Error recovering from audio send failure: %s", recovery_error)
     
     async def send_text(self, text: str, end_of_turn: bool = True):
         """Send text input to Gemini to trigger a voice response"""
-        if not self.is_connected or not self.session:
-            if not await self._auto_reconnect():
+        if not self._connected_event.is_set() or not self.session:
+            if not await self._ensure_connected():
                 return
             
         try:
-            await self.session.send(input=text, end_of_turn=end_of_turn)
+            async with asyncio.timeout(self._SEND_TIMEOUT):
+                await self.session.send(input=text, end_of_turn=end_of_turn)
             self._update_activity()
-            self._consecutive_errors = 0
+            self._record_success()
         except Exception as e:
-            self._consecutive_errors += 1
-            logging.error(f"Error sending text: {e}")
-            await self._handle_api_error(e)
+            self._record_error()
+            _log.error("Error sending text: %s", e)
+            if isinstance(e, TimeoutError):
+                self.is_connected = False
+                await self._ensure_connected()
+            else:
+                await self._handle_api_error(e)
     
-    async def receive_responses(self) -> AsyncGenerator[Dict[str, Any], None]:
+    async def receive_responses(self) -> AsyncGenerator[GeminiChunk, None]:
         """Receive responses from Gemini with error handling"""
         if not self.is_connected or not self.session:
             return
@@ -138,65 +241,26 @@ class GeminiVoiceClient:
             while True:
                 turn = self.session.receive()
                 async for response in turn:
-                    response_data = {}
-                    
-                    # Handle interruption
-                    if response.server_content and response.server_content.interrupted:
-                        response_data['interrupted'] = True
-                        yield response_data
+                    chunk = extract_response(response)
+                    if chunk is None:
                         continue
                     
-                    # Handle function calls from multiple possible locations
-                    function_calls_found = []
-                    
-                    # Check response.tool_call (old SDK format)
-                    if hasattr(response, 'tool_call') and response.tool_call:
-                        if hasattr(response.tool_call, 'function_calls'):
-                            function_calls_found.extend(response.tool_call.function_calls)
-                            logging.info(f"🔧 Function calls in tool_call: {len(response.tool_call.function_calls)}")
-                    
-                    # Check server_content.model_turn.parts for function calls (Live API format)
-                    if response.server_content and response.server_content.model_turn:
-                        for part in response.server_content.model_turn.parts:
-                            # Extract audio
-                            if part.inline_data and isinstance(part.inline_data.data, bytes):
-                                response_data['audio'] = part.inline_data.data
-                            # Extract text
-                            if hasattr(part, 'text') and part.text:
-                                response_data['text'] = part.text
-                            # Extract function calls
-                            if hasattr(part, 'function_call') and part.function_call:
-                                function_calls_found.append(part.function_call)
-                                logging.info(f"🔧 Function call in model_turn.parts: {part.function_call.name if hasattr(part.function_call, 'name') else 'unknown'}")
-                    
-                    # Add to response if any found
-                    if function_calls_found:
-                        response_data['function_calls'] = function_calls_found
-                        logging.info(f"✨ Total function calls found: {len(function_calls_found)}")
-                    
-                    # Handle user transcription if available (input_transcription)
-                    if hasattr(response, 'server_content') and response.server_content:
-                        if hasattr(response.server_content, 'input_transcription') and response.server_content.input_transcription:
-                            response_data['user_transcription'] = response.server_content.input_transcription
-                        # Also check for turn_complete which may have transcription
-                        if hasattr(response.server_content, 'turn_complete') and response.server_content.turn_complete:
-                            response_data['turn_complete'] = True
+                    # Interruptions are yielded immediately without bookkeeping
+                    if chunk.interrupted:
+                        yield chunk
+                        continue
                     
-                    # Handle session resumption updates
-                    if (hasattr(response, 'session_resumption_update') and 
-                        response.session_resumption_update and
-                        hasattr(response.session_resumption_update, 'resumable') and
-                        response.session_resumption_update.resumable):
-                        response_data['session_handle'] = response.session_resumption_update.new_handle
+                    # Track the latest handle so auto-reconnect can resume this session
+                    if chunk.session_handle:
+                        self._last_handle = chunk.session_handle
                     
-                    if response_data:
-                        self._update_activity()
-                        self._consecutive_errors = 0
-                        await self.key_manager.mark_key_used(self.current_key, success=True)
-                        yield response_data
+                    self._update_activity()
+                    self._record_success()
+                    await self.key_manager.mark_key_used(self.current_key, success=True)
+                    yield chunk
                     
         except Exception as e:
-            logging.error(f"Error receiving responses: {e}")
+            _log.error("Error receiving responses: %s", e)
             await self._handle_api_error(e)
     async def send_function_response(self, function_call_id: str, function_name: str, result: str):
         """Send function/tool call response back to Gemini Live API"""
@@ -205,34 +269,34 @@ class GeminiVoiceClient:
             
         try:
             # Live API uses send_tool_response with FunctionResponse format
-            from google.genai import types
-            
             function_response = types.FunctionResponse(
                 id=function_call_id,
                 name=function_name,
                 response={"result": result}
             )
             
-            await self.session.send_tool_response(function_responses=[function_response])
-            logging.info(f"✅ Sent tool response for {function_name}")
+            async with asyncio.timeout(self._SEND_TIMEOUT):
+                await self.session.send_tool_response(function_responses=[function_response])
+            _log.info("✅ Sent tool response for %s", function_name)
         except Exception as e:
-            logging.error(f"Error sending function response: {e}")
+            _log.error("Error sending function response: %s", e)
     
     async def send_goodbye(self):
         """Send a goodbye message via text input"""
         if self.is_connected and self.session:
-            goodbye_msg = random.choice(get_goodbye_responses())
+            goodbye_msg = pick_goodbye_response()
             try:
                 # Use send() with text content for Gemini Live API
-                await self.session.send(input=goodbye_msg, end_of_turn=True)
+                async with asyncio.timeout(self._SEND_TIMEOUT):
+                    await self.session.send(input=goodbye_msg, end_of_turn=True)
                 # Give time for response
                 await asyncio.sleep(2)
             except Exception as e:
-                logging.error(f"Error sending goodbye: {e}")
+                _log.error("Error sending goodbye: %s", e)
     
     async def get_connection_status(self) -> Dict[str, Any]:
         """Get detailed connection and key status"""
-        time_since_activity = datetime.now() - self._last_activity
+        time_since_activity = time.monotonic() - self._last_activity
         
         status = {
             'is_connected': self.is_connected,
@@ -243,8 +307,8 @@ class GeminiVoiceClient:
             'voice_name': self.voice_name,
             'model': self.model,
             # Health monitoring info
-            'last_activity_seconds_ago': time_since_activity.seconds,
-            'consecutive_errors': self._consecutive_errors,
+            'last_activity_seconds_ago': int(time_since_activity),
+            'error_score': round(self._err_score, 2),
             'connection_healthy': await self.check_connection_health()
         }
         
@@ -268,7 +332,7 @@ class GeminiVoiceClient:
         
         # Check if current key status is problematic
         if self.current_key.status in [KeyStatus.RATE_LIMITED, KeyStatus.INVALID, KeyStatus.DISABLED]:
-            logging.warning(f"Current key {self.current_key.name} has status: {self.current_key.status.value}")
+            _log.warning("Current key %s has status: %s", self.current_key.name, self.current_key.status.value)
             
             # Try to rotate to a better key
             next_key = await self.key_manager.rotate_key()
@@ -286,27 +350,104 @@ class GeminiVoiceClient:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.cleanup()
     
+    def set_tools(self, tools: Optional[List[Dict[str, Any]]]):
+        """Replace tool declarations; takes effect on the next (re)connect"""
+        self.tools = tools or []
+        self._compiled_tools = self._compile_tools(self.tools)
+        self._invalidate_config()
+    
+    def set_voice(self, voice_name: str):
+        """Change the prebuilt voice; takes effect on the next (re)connect"""
+        self.voice_name = voice_name
+        self._invalidate_config()
+    
+    @staticmethod
+    def _compile_tools(tools: List[Dict[str, Any]]) -> List[Any]:
+        """Validate tool declarations into SDK Tool objects once, so connects skip re-parsing"""
+        if not tools:
+            return []
+        try:
+            return [types.Tool(function_declarations=tools)]
+        except Exception as e:
+            # Fall back to the raw dict form the SDK also accepts
+            _log.warning("Could not pre-build tool declarations, using raw dicts: %s", e)
+            return [{"function_declarations": tools}]
+    
+    def _invalidate_config(self):
+        """Drop the cached live-session config so it is rebuilt on next use"""
+        self._cached_config = None
+    
+    def _get_config(self) -> Dict[str, Any]:
+        """Return the live-session config, building it once per prompt/voice/tools change"""
+        if self._cached_config is None:
+            # Configure for voice interaction - use simple dict format per official docs
+            config = {
+                "response_modalities": ["AUDIO"],
+                "system_instruction": self._system_prompt,
+                "speech_config": {
+                    "voice_config": {
+                        "prebuilt_voice_config": {
+                            "voice_name": self.voice_name
+                        }
+                    }
+                }
+            }
+            
+            # Add tools for function calling if provided
+            if self._compiled_tools:
+                config["tools"] = self._compiled_tools
+            
+            self._cached_config = config
+        return self._cached_config
+    
+    def _get_client(self, key) -> genai.Client:
+        """Return the cached client for a key, creating it on first use"""
+        client = self._clients.get(key.name)
+        if client is None:
+            client = genai.Client(api_key=key.key)
+            self._clients[key.name] = client
+        return client
+    
+    def _record_error(self):
+        """Fold an error into the decaying error score"""
+        self._err_score = min(self._err_score * self._ERR_SCORE_DECAY + 1.0, self._ERR_SCORE_MAX)
+    
+    def _record_success(self):
+        """Decay the error score on a successful operation"""
+        self._err_score *= self._ERR_SCORE_DECAY
+    
     def _update_activity(self):
         """Update last activity timestamp"""
-        self._last_activity = datetime.now()
+        self._last_activity = time.monotonic()
     
     async def check_connection_health(self) -> bool:
         """Check if connection is healthy based on activity and errors"""
-        if not self.is_connected or not self.session:
-            return False
-        
-        # Check if connection is stale (no activity for too long)
-        time_since_activity = datetime.now() - self._last_activity
-        if time_since_activity > self._connection_check_interval * 2:
-            logging.warning(f"⚠️ Connection may be stale (no activity for {time_since_activity.seconds}s)")
-            return False
-        
-        # Check consecutive errors
-        if self._consecutive_errors >= self._max_consecutive_errors // 2:
-            logging.warning(f"⚠️ High error rate: {self._consecutive_errors} consecutive errors")
-            return False
+        return (self._healthy and self.is_connected and self.session is not None
+                and self._err_score < self._ERR_SCORE_TRIP / 2)
+    
+    async def _watchdog(self):
+        """Sleep until the activity deadline; reconnect once if the connection went stale"""
+        stale_after = self._connection_check_interval_s * 2
+        while self.is_connected:
+            idle = time.monotonic() - self._last_activity
+            if idle < stale_after:
+                await asyncio.sleep(stale_after - idle)
+                continue
+            
+            _log.warning("⚠️ Connection stale (no activity for %ds), reconnecting...", idle)
+            self._healthy = False
+            self.is_connected = False
+            await self._ensure_connected()
+    
+    async def _ensure_connected(self) -> bool:
+        """Reconnect if needed, sharing one in-flight reconnect across all callers"""
+        if self._connected_event.is_set() and self.session:
+            return True
         
-        return True
+        # Only the first caller starts a reconnect; the rest park on the same task
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._auto_reconnect())
+        return await asyncio.shield(self._reconnect_task)
     
     async def _auto_reconnect(self) -> bool:
         """Attempt to automatically reconnect if disconnected"""
@@ -315,7 +456,7 @@ class GeminiVoiceClient:
             if self.is_connected and self.session:
                 return True
             
-            logging.info("🔄 Attempting auto-reconnect...")
+            _log.info("🔄 Attempting auto-reconnect...")
             
             try:
                 # Cleanup old session if exists
@@ -325,133 +466,172 @@ class GeminiVoiceClient:
                     except Exception:
                         pass
                     self._session_context = None
-                    self.session = None
+                self.session = None
                 
-                # Rebuild config
-                config = {
-                    "response_modalities": ["AUDIO"],
-                    "system_instruction": self._system_prompt,
-                    "speech_config": {
-                        "voice_config": {
-                            "prebuilt_voice_config": {
-                                "voice_name": self.voice_name
-                            }
-                        }
-                    }
-                }
-                
-                if self.tools:
-                    config["tools"] = [{"function_declarations": self.tools}]
+                # Reuse cached config, resuming the last session when possible
+                config = self._get_config()
+                if self._last_handle:
+                    self.session = await self._connect_with_retry(
+                        {**config, "session_resumption": {"handle": self._last_handle}}
+                    )
+                    if not self.session:
+                        # Handle may have expired - fall back to a fresh session
+                        _log.info("Session resumption failed, starting fresh session")
+                        self._last_handle = None
                 
                 # Reconnect
-                self.session = await self._connect_with_retry(config)
+                if not self.session:
+                    self.session = await self._connect_with_retry(config)
                 if self.session:
                     self.is_connected = True
-                    self._consecutive_errors = 0
+                    self._start_background_tasks()
+                    self._err_score = 0.0
                     self._update_activity()
-                    logging.info("✅ Auto-reconnect successful")
+                    _log.info("✅ Auto-reconnect successful")
                     return True
                 else:
                     self.is_connected = False
-                    logging.error("❌ Auto-reconnect failed")
+                    _log.error("❌ Auto-reconnect failed")
                     return False
                     
             except Exception as e:
-                logging.error(f"❌ Auto-reconnect error: {e}")
+                _log.error("❌ Auto-reconnect error: %s", e)
                 self.is_connected = False
                 return False
     
-    async def _connect_with_retry(self, config, max_retries: int = 3) -> Optional[Any]:
-        """Connect to Gemini with automatic key rotation on failure"""
+    async def _open_session(self, client, config):
+        """Open a live session, returning (context manager, session)"""
+        # live.connect returns an async context manager, enter it
+        context = client.aio.live.connect(model=self.model, config=config)
+        try:
+            async with asyncio.timeout(self._CONNECT_TIMEOUT):
+                return context, await context.__aenter__()
+        except (TimeoutError, asyncio.CancelledError) as e:
+            # Timed out or lost a race mid-handshake - release whatever was half opened
+            await self._close_context(context, e)
+            raise
+    
+    async def _race_connect(self, keys, config) -> Optional[Any]:
+        """Connect with several keys in parallel and keep the first session that opens"""
+        tasks = {
+            asyncio.create_task(self._open_session(self._get_client(key), config)): key
+            for key in keys
+        }
+        pending = set(tasks)
+        winner = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        await self._record_connect_error(tasks[task], task.exception())
+                    elif winner is None:
+                        winner = task
+                    else:
+                        # Another key also connected in the same tick - close the spare session
+                        await self._close_context(task.result()[0])
+        finally:
+            for task in pending:
+                task.cancel()
+            # Await the losers; any that opened before the cancel landed are closed, not leaked
+            for result in await asyncio.gather(*pending, return_exceptions=True):
+                if not isinstance(result, BaseException):
+                    await self._close_context(result[0])
+        
+        if winner is None:
+            return None
+        
+        key = tasks[winner]
+        self._session_context, session = winner.result()
+        self.current_key = key
+        self.client = self._get_client(key)
+        await self.key_manager.select_key(key)
+        _log.info("Connected first with key: %s", key.name)
+        return session
+    
+    @staticmethod
+    async def _close_context(context, error: Optional[BaseException] = None):
+        """Exit a live session context, ignoring errors from an already-dead connection"""
+        try:
+            if error is None:
+                await context.__aexit__(None, None, None)
+            else:
+                await context.__aexit__(type(error), error, error.__traceback__)
+        except Exception:
+            pass
+    
+    async def _connect_with_retry(self, config, max_retries: int = 3, race: bool = False) -> Optional[Any]:
+        """Connect to Gemini with automatic key rotation on failure
+        
+        race=True (startup only) tries several healthy keys in parallel first;
+        reconnects stay sequential so they don't open a session on every key.
+        """
+        if race:
+            keys = await self.key_manager.get_available_keys(limit=self._CONNECT_RACE_KEYS)
+            if len(keys) > 1:
+                session = await self._race_connect(keys, config)
+                if session:
+                    return session
+                _log.warning("All raced keys failed, falling back to sequential retry")
+        
         for attempt in range(max_retries):
             try:
-                # live.connect returns an async context manager, enter it
-                session = self.client.aio.live.connect(
-                    model=self.model, 
-                    config=config
-                )
-                # Enter the context manager to get the actual session
-                self._session_context = session
-                actual_session = await session.__aenter__()
+                self._session_context, actual_session = await self._open_session(self.client, config)
                 return actual_session
                 
             except Exception as e:
-                error_msg = str(e).lower()
-                logging.error(f"Connection error: {e}")
-                
-                # Detect rate limiting / quota exhaustion
-                is_rate_limited = any(term in error_msg for term in [
-                    "rate limit", "quota", "resource_exhausted", "exhausted",
-                    "429", "too many requests", "exceeded"
-                ])
-                
-                # Detect invalid/unauthorized keys
-                is_invalid_key = any(term in error_msg for term in [
-                    "unauthorized", "api_key", "permission denied", 
-                    "403", "401", "invalid api key"
-                ])
-                
-                # Detect temporary/retriable errors (not key issues)
-                is_temporary = any(term in error_msg for term in [
-                    "timeout", "connection", "network", "unavailable",
-                    "503", "502", "500", "internal"
-                ])
-                
-                if is_rate_limited:
-                    logging.warning(f"🚫 Rate limit/quota hit on key {self.current_key.name}")
-                    await self.key_manager.handle_rate_limit(self.current_key)
-                elif is_invalid_key:
-                    logging.error(f"❌ Invalid/unauthorized key {self.current_key.name}")
-                    await self.key_manager.handle_invalid_key(self.current_key)
-                elif is_temporary:
-                    logging.warning(f"⚠️ Temporary error on key {self.current_key.name}, will retry")
-                    await self.key_manager.mark_key_used(self.current_key, success=False)
-                else:
-                    # Unknown error - don't mark key as bad, might be config issue
-                    logging.error(f"❓ Unknown error with key {self.current_key.name}: {e}")
-                    await self.key_manager.mark_key_used(self.current_key, success=False)
+                await self._record_connect_error(self.current_key, e)
                 
                 # Try next key if available
                 if attempt < max_retries - 1:
                     next_key = await self.key_manager.rotate_key()
                     if next_key and next_key != self.current_key:
                         self.current_key = next_key
-                        self.client = genai.Client(api_key=self.current_key.key)
-                        logging.info(f"Retrying with key: {self.current_key.name}")
+                        self.client = self._get_client(self.current_key)
+                        _log.info("Retrying with key: %s", self.current_key.name)
                         continue
                 
                 # If this was the last attempt or no other keys available
                 if attempt == max_retries - 1:
-                    logging.error("All connection attempts failed")
+                    _log.error("All connection attempts failed")
                     return None
         
         return None
     
+    async def _record_connect_error(self, key, e: Exception):
+        """Classify a connection failure and update the key's status accordingly"""
+        error_class = _classify_error(e)
+        _log.error("Connection error: %s", e)
+        
+        if error_class == "rate_limited":
+            _log.warning("🚫 Rate limit/quota hit on key %s", key.name)
+            await self.key_manager.handle_rate_limit(key)
+        elif error_class == "invalid_key":
+            _log.error("❌ Invalid/unauthorized key %s", key.name)
+            await self.key_manager.handle_invalid_key(key)
+            self._clients.pop(key.name, None)
+        elif error_class == "temporary":
+            _log.warning("⚠️ Temporary error on key %s, will retry", key.name)
+            await self.key_manager.mark_key_used(key, success=False)
+        else:
+            # Unknown error - don't mark key as bad, might be config issue
+            _log.error("❓ Unknown error with key %s: %s", key.name, e)
+            await self.key_manager.mark_key_used(key, success=False)
+    
     async def _handle_api_error(self, error: Exception):
         """Handle API errors and rotate keys if necessary"""
-        error_msg = str(error).lower()
-        
-        # Detect rate limiting / quota exhaustion
-        is_rate_limited = any(term in error_msg for term in [
-            "rate limit", "quota", "resource_exhausted", "exhausted",
-            "429", "too many requests", "exceeded"
-        ])
+        error_class = _classify_error(error)
         
-        # Detect invalid/unauthorized keys
-        is_invalid_key = any(term in error_msg for term in [
-            "unauthorized", "api_key", "permission denied", 
-            "403", "401", "invalid api key"
-        ])
-        
-        if is_rate_limited:
-            logging.warning(f"🚫 Rate limit during operation on key {self.current_key.name}")
+        if error_class == "rate_limited":
+            _log.warning("🚫 Rate limit during operation on key %s", self.current_key.name)
             await self.key_manager.handle_rate_limit(self.current_key)
             next_key = await self.key_manager.rotate_key()
             if next_key and next_key != self.current_key:
                 await self._reconnect_with_new_key(next_key)
-        elif is_invalid_key:
-            logging.error(f"❌ Invalid key during operation: {self.current_key.name}")
+        elif error_class == "invalid_key":
+            _log.error("❌ Invalid key during operation: %s", self.current_key.name)
             await self.key_manager.handle_invalid_key(self.current_key)
+            self._clients.pop(self.current_key.name, None)
             next_key = await self.key_manager.rotate_key()
             if next_key and next_key != self.current_key:
                 await self._reconnect_with_new_key(next_key)
@@ -462,20 +642,32 @@ class GeminiVoiceClient:
         """Reconnect with a new API key"""
         try:
             self.current_key = new_key
-            self.client = genai.Client(api_key=self.current_key.key)
-            logging.info(f"Reconnected with new key: {self.current_key.name}")
+            self.client = self._get_client(self.current_key)
+            _log.info("Reconnected with new key: %s", self.current_key.name)
         except Exception as e:
-            logging.error(f"Failed to reconnect with new key: {e}")    
+            _log.error("Failed to reconnect with new key: %s", e)    
 
     async def cleanup(self):
         """Clean up Gemini client resources"""
         try:
+            # Reconnect goes last: the sender and watchdog can start one until they stop,
+            # and an in-flight one must not reopen a session after cleanup
+            for task in (self._sender_task, self._watchdog_task, self._reconnect_task):
+                if task and not task.done():
+                    task.cancel()
+                    try:
+                        await task
+                    except asyncio.CancelledError:
+                        pass
+            self._sender_task = None
+            self._watchdog_task = None
+            self._reconnect_task = None
             if self._session_context:
                 await self._session_context.__aexit__(None, None, None)
             self.is_connected = False
-            logging.info("Gemini client cleanup completed")
+            _log.info("Gemini client cleanup completed")
         except Exception as e:
-            logging.error(f"Error during Gemini cleanup: {e}")
+            _log.error("Error during Gemini cleanup: %s", e)
     
     async def force_key_rotation(self) -> bool:
         """Force rotation to next available key"""
@@ -488,10 +680,10 @@ class GeminiVoiceClient:
         if next_key and next_key != self.current_key:
             success = await self._reconnect_with_new_key(next_key)
             if success:
-                logging.info(f"Forced rotation from {current_name} to {next_key.name}")
+                _log.info("Forced rotation from %s to %s", current_name, next_key.name)
                 return True
         
-        logging.warning("Force rotation failed - no better keys available")
+        _log.warning("Force rotation failed - no better keys available")
         return False
     
     async def get_key_usage_stats(self) -> Dict[str, Any]:
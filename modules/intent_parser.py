@@ -8,16 +8,92 @@ Rules followed:
 - aiofiles for file I/O
 """
 import asyncio
+import functools
 import logging
 import re
+import time
+from collections import deque
 from typing import Dict, Any, List, Optional, Tuple, Set
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field, replace
+from datetime import datetime
 from enum import Enum
 import json
 import aiofiles
 from difflib import SequenceMatcher, get_close_matches
 
+try:
+    from rapidfuzz import fuzz, process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Argument extraction patterns, compiled once
+_QUOTE_RE = re.compile(r'["\']([^"\']+)["\']')
+_PATH_RE = re.compile(r'[A-Za-z]:\\[^\s"\']+')
+_URL_RE = re.compile(r'https?://[^\s]+')
+_NUM_RE = re.compile(r'\b\d+\b')
+
+
+def _priority_union(named_patterns: List[Tuple[str, List[str]]]) -> "re.Pattern[str]":
+    """Fuse ordered (group name, patterns) pairs into one regex for use with .match()
+
+    The match's lastgroup is the first name, in order, whose patterns occur anywhere
+    in the text - the same answer as searching each pattern in turn.
+    """
+    branches = []
+    for name, patterns in named_patterns:
+        body = "|".join(f"(?:{p})" if p.startswith("^") else f".*?(?:{p})" for p in patterns)
+        branches.append(f"(?P<{name}>{body})")
+    return re.compile("|".join(branches), re.IGNORECASE | re.DOTALL)
+
+
+def _trie_pattern(phrases: List[str]) -> str:
+    """Build a regex body from a character trie of phrases
+
+    Alternatives share their prefixes, so the engine branches once per character
+    instead of retrying every phrase, and the greedy optional tails prefer the
+    longest phrase at each position.
+    """
+    trie: Dict[str, Any] = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+    
+    return build(trie)
+
+
+def _keyword_index(groups: Dict[str, List[str]]) -> Tuple["re.Pattern[str]", Dict[str, Tuple[str, ...]], Dict[str, Tuple[str, ...]]]:
+    """Index keyword groups for a single overlapping sweep of the text
+
+    Returns (scan, contained, owners): scan's group 1 yields the longest keyword
+    starting at each position, contained maps a keyword to every keyword that is
+    a substring of it (itself included), and owners maps a keyword to its groups.
+    Together they recover exactly the set of keywords for which `keyword in text`.
+    """
+    owners: Dict[str, List[str]] = {}
+    for group, keywords in groups.items():
+        for kw in keywords:
+            owners.setdefault(kw, []).append(group)
+    
+    contained = {kw: tuple(k for k in owners if k in kw) for kw in owners}
+    scan = re.compile(f"(?=({_trie_pattern(list(owners))}))")
+    return scan, contained, {kw: tuple(gs) for kw, gs in owners.items()}
+
 
 class IntentType(Enum):
     """Types of user intents"""
@@ -31,6 +107,10 @@ class IntentType(Enum):
     CORRECTION = "correction"      # User is correcting
 
 
+# Value -> member, so learned mappings skip the Enum call machinery
+_INTENT_BY_VALUE = {t.value: t for t in IntentType}
+
+
 @dataclass
 class ParsedIntent:
     """Result of parsing user input"""
@@ -154,17 +234,42 @@ class IntentParser:
         "smart_home": ["light", "temperature", "thermostat", "home assistant", "smart"],
     }
     
+    # Action verbs in priority order
+    ACTION_VERBS = ["open", "close", "find", "show", "create", "delete", "move", 
+                    "copy", "save", "play", "pause", "mute", "run", "stop", "search"]
+    
+    # Common app names for argument extraction
+    APP_NAMES = ["chrome", "firefox", "edge", "notepad", "code", "vscode", "spotify", 
+                 "discord", "steam", "explorer", "terminal", "powershell", "cmd"]
+    
+    # Compiled once at class load so parse() never goes through the re module cache
+    _VAGUE_UNION = _priority_union([(f"v{i}", [p]) for i, p in enumerate(VAGUE_PATTERNS)])
+    _VAGUE_TYPES = list(VAGUE_PATTERNS.values())
+    _INTENT_UNION = _priority_union([(t.name.lower(), ps) for t, ps in INTENT_PATTERNS.items()])
+    _KEYWORD_SCAN, _KEYWORD_CONTAINED, _KEYWORD_OWNERS = _keyword_index(
+        {**TOOL_KEYWORDS, "@action": ACTION_VERBS, "@app": APP_NAMES}
+    )
+    _KEYWORD_BOUNDARY = {
+        kw: re.compile(rf'\b{re.escape(kw)}\b') for kw in {k for kws in TOOL_KEYWORDS.values() for k in kws}
+    }
+    _ACTION_COMPILED = [(verb, re.compile(rf'\b{verb}\b')) for verb in ACTION_VERBS]
+    
     def __init__(self, learning_file: str = "intent_learning.json"):
         self.learning_file = learning_file
         self._lock = asyncio.Lock()
         self._reverse_synonyms: Dict[str, str] = {}  # word -> canonical form
         self._learned_mappings: Dict[str, Dict[str, Any]] = {}  # phrase -> intent mapping
-        self._context_history: List[Dict[str, Any]] = []
+        self._custom_synonyms: Dict[str, List[str]] = {}  # canonical -> synonyms added at runtime or loaded
+        self._context_history: deque = deque(maxlen=20)  # Oldest entries fall off automatically
         self._last_intent: Optional[ParsedIntent] = None
+        self._last_parsed: Optional[ParsedIntent] = None  # Full-path result, reused for a repeated input
         self._ambiguity_threshold = 0.6
-        self._recent_words: Set[str] = set()  # Track recently used words for context
-        self._word_expiry = timedelta(minutes=10)  # How long words stay in recent set
-        self._word_timestamps: Dict[str, datetime] = {}  # When each word was last used
+        self._word_expiry = 600.0  # Seconds words stay in recent set
+        self._word_timestamps: Dict[str, float] = {}  # Recently used words -> last use (monotonic)
+        self._word_queue: deque = deque()  # (timestamp, word) in insertion order, for expiry
+        self._dirty = False  # Learning changed since the last save
+        self._flush_interval = 1.0  # Seconds between debounced saves
+        self._flush_task: Optional[asyncio.Task] = None
         self._build_reverse_synonyms()
     
     def _build_reverse_synonyms(self):
@@ -173,43 +278,95 @@ class IntentParser:
             self._reverse_synonyms[canonical] = canonical
             for syn in synonyms:
                 self._reverse_synonyms[syn.lower()] = canonical
+        self._synonyms_changed()
+    
+    def _synonyms_changed(self):
+        """Rebuild everything derived from _reverse_synonyms"""
+        self._compile_synonym_matcher()
+        self._index_vocabulary()
+        self._last_parsed = None
+        # A fresh cache per synonym table, so stale normalizations can never be served
+        self._normalize_cached = functools.lru_cache(maxsize=512)(self._normalize_uncached)
+    
+    def _index_vocabulary(self):
+        """Bucket the synonym vocabulary by length for _close_matches"""
+        by_len: Dict[int, List[str]] = {}
+        for word in self._reverse_synonyms:
+            by_len.setdefault(len(word), []).append(word)
+        self._vocab_by_len = {n: tuple(words) for n, words in by_len.items()}
+        self._close_match_cache: Dict[str, List[str]] = {}
+    
+    def _close_matches(self, word: str) -> List[str]:
+        """get_close_matches(word, vocab, n=3, cutoff=0.6), pruned by length and memoized
+        
+        A SequenceMatcher ratio can never exceed 2*min(a, b)/(a + b) for lengths a and b,
+        so vocabulary buckets whose length rules out 0.6 are skipped without scoring.
+        """
+        cached = self._close_match_cache.get(word)
+        if cached is not None:
+            return cached
+        
+        n = len(word)
+        candidates = [
+            w for m, words in self._vocab_by_len.items()
+            if n + m and 2.0 * min(n, m) / (n + m) >= 0.6
+            for w in words
+        ]
+        matches = get_close_matches(word, candidates, n=3, cutoff=0.6)
+        
+        if len(self._close_match_cache) >= 1024:
+            self._close_match_cache.clear()
+        self._close_match_cache[word] = matches
+        return matches
+    
+    def _compile_synonym_matcher(self):
+        """Compile every synonym phrase into one whole-token matcher for _normalize_input"""
+        # Only single-spaced, non-empty phrases can ever match normalized text
+        phrases = [k for k in self._reverse_synonyms if k and k == " ".join(k.split())]
+        self._synonym_re = re.compile(rf"(?<!\S){_trie_pattern(phrases)}(?!\S)")
+        # A phrase can only match where a token equals its first word
+        self._synonym_heads = frozenset(phrase.split(" ", 1)[0] for phrase in phrases)
+        # Bind the replacement once; _normalize_uncached is then a single C-level sub call
+        reverse = self._reverse_synonyms
+        self._synonym_sub = functools.partial(self._synonym_re.sub, lambda m: reverse[m[0]])
     
     def _track_recent_words(self, text: str):
         """Track recently used words for context awareness"""
-        now = datetime.now()
+        now = time.monotonic()
         words = set(text.lower().split())
         
         # Add new words
         for word in words:
-            self._recent_words.add(word)
             self._word_timestamps[word] = now
-        
-        # Clean up expired words
-        expired_words: Set[str] = set()
-        for word, timestamp in self._word_timestamps.items():
-            if now - timestamp > self._word_expiry:
-                expired_words.add(word)
-        
-        for word in expired_words:
-            self._recent_words.discard(word)
-            del self._word_timestamps[word]
+            self._word_queue.append((now, word))
+        
+        # Clean up expired words - the queue is in time order, so stop at the first live entry
+        queue = self._word_queue
+        cutoff = now - self._word_expiry
+        while queue and queue[0][0] < cutoff:
+            timestamp, word = queue.popleft()
+            # Skip stale entries for words that have been used again since
+            if self._word_timestamps.get(word) == timestamp:
+                del self._word_timestamps[word]
     
     def get_recent_words(self) -> Set[str]:
         """Get set of recently used words (within expiry window)"""
-        now = datetime.now()
+        now = time.monotonic()
+        expiry = self._word_expiry
         # Filter to only non-expired words
-        active_words: Set[str] = set()
-        for word in self._recent_words:
-            if word in self._word_timestamps:
-                if now - self._word_timestamps[word] <= self._word_expiry:
-                    active_words.add(word)
-        return active_words
+        return {word for word, ts in self._word_timestamps.items() if now - ts <= expiry}
     
     def has_recent_context_for(self, keywords: List[str]) -> bool:
         """Check if any keywords appear in recent word context"""
-        recent = self.get_recent_words()
-        keyword_set: Set[str] = set(k.lower() for k in keywords)
-        return bool(recent & keyword_set)  # Set intersection
+        # Probe the few keywords rather than materializing the whole recent set
+        now = time.monotonic()
+        timestamps = self._word_timestamps
+        expiry = self._word_expiry
+        for keyword in keywords:
+            ts = timestamps.get(keyword.lower())
+            if ts is not None and now - ts <= expiry:
+                return True
+        return False
     
     async def initialize(self) -> bool:
         """Initialize intent parser"""
@@ -237,107 +394,107 @@ class IntentParser:
         Returns:
             ParsedIntent with analysis
         """
-        async with self._lock:
-            # Normalize input
-            normalized = self._normalize_input(user_input)
-            
-            # Track words for context
-            self._track_recent_words(normalized)
-            
-            # Check for vague commands first
-            vague_type = self._detect_vague_command(normalized)
-            if vague_type:
-                return await self._handle_vague_command(user_input, normalized, vague_type, context)
-            
-            # Check learned mappings
-            learned = self._check_learned_mapping(normalized)
-            if learned:
-                return learned
-            
-            # Detect intent type
-            intent_type, confidence = self._detect_intent_type(normalized)
-            
-            # Extract tool and action hints
-            tool_hint = self._detect_tool(normalized)
-            action_hint = self._detect_action(normalized)
-            
-            # Extract arguments
-            extracted_args = self._extract_arguments(normalized, tool_hint)
-            
-            # Check if clarification needed
-            needs_clarification = confidence < self._ambiguity_threshold
-            clarification_question = None
-            alternatives = []
-            
-            if needs_clarification:
-                alternatives = self._get_alternatives(normalized)
-                if alternatives:
-                    clarification_question = self._generate_clarification(normalized, alternatives)
-            
-            intent = ParsedIntent(
-                raw_input=user_input,
-                normalized_input=normalized,
-                intent_type=intent_type,
-                confidence=confidence,
-                tool_hint=tool_hint,
-                action_hint=action_hint,
-                extracted_args=extracted_args,
-                alternatives=alternatives,
-                needs_clarification=needs_clarification,
-                clarification_question=clarification_question,
-                context_used=[]
-            )
-            
-            # Store for context
-            self._last_intent = intent
-            self._context_history.append({
-                "input": user_input,
-                "intent": intent_type.value,
-                "timestamp": datetime.now().isoformat()
-            })
-            if len(self._context_history) > 20:
-                self._context_history = self._context_history[-20:]
-            
-            return intent
+        # No lock here: from normalizing to publishing _last_intent there is no await,
+        # so nothing else on the loop can interleave, and parse() no longer queues
+        # behind learn_mapping()/add_synonym() while they save to disk
+        
+        # Same input as the last fully parsed one (enter pressed twice, retries) - the
+        # result cannot differ, so hand back a copy and skip every pass
+        last = self._last_parsed
+        if last is not None and user_input == last.raw_input:
+            self._track_recent_words(last.normalized_input)
+            return self._remember(replace(
+                last,
+                extracted_args=dict(last.extracted_args),
+                alternatives=list(last.alternatives),
+                context_used=list(last.context_used)
+            ))
+        
+        # Normalize input
+        normalized = self._normalize_input(user_input)
+        
+        # Track words for context
+        self._track_recent_words(normalized)
+        
+        # Check for vague commands first
+        vague_type = self._detect_vague_command(normalized)
+        if vague_type:
+            return await self._handle_vague_command(user_input, normalized, vague_type, context)
+        
+        # Check learned mappings
+        learned = self._check_learned_mapping(normalized)
+        if learned:
+            return learned
+        
+        # Detect intent type
+        intent_type, confidence = self._detect_intent_type(normalized)
+        
+        # Extract tool, action and app hints in one keyword sweep
+        tool_hint, action_hint, app = self._scan_keywords(normalized)
+        
+        # Extract arguments
+        extracted_args = self._extract_arguments(normalized, tool_hint, app)
+        
+        # Check if clarification needed
+        needs_clarification = confidence < self._ambiguity_threshold
+        clarification_question = None
+        alternatives = []
+        
+        if needs_clarification:
+            alternatives = self._get_alternatives(normalized)
+            if alternatives:
+                clarification_question = self._generate_clarification(normalized, alternatives)
+        
+        intent = ParsedIntent(
+            raw_input=user_input,
+            normalized_input=normalized,
+            intent_type=intent_type,
+            confidence=confidence,
+            tool_hint=tool_hint,
+            action_hint=action_hint,
+            extracted_args=extracted_args,
+            alternatives=alternatives,
+            needs_clarification=needs_clarification,
+            clarification_question=clarification_question,
+            context_used=[]
+        )
+        
+        self._last_parsed = intent
+        return self._remember(intent)
+    
+    def _remember(self, intent: ParsedIntent) -> ParsedIntent:
+        """Store a parsed intent for context"""
+        self._last_intent = intent
+        self._context_history.append({
+            "input": intent.raw_input,
+            "intent": intent.intent_type.value,
+            "timestamp": datetime.now().isoformat()
+        })
+        return intent
 
     def _normalize_input(self, text: str) -> str:
+        """Normalize input text (memoized - interactive inputs repeat a lot)"""
+        return self._normalize_cached(text)
+    
+    def _normalize_uncached(self, text: str) -> str:
         """Normalize input text"""
-        # Lowercase
-        normalized = text.lower().strip()
-        
-        # Replace synonyms with canonical forms
-        words = normalized.split()
-        normalized_words = []
-        
-        i = 0
-        while i < len(words):
-            # Try multi-word synonyms first (up to 3 words)
-            matched = False
-            for length in range(3, 0, -1):
-                if i + length <= len(words):
-                    phrase = " ".join(words[i:i+length])
-                    if phrase in self._reverse_synonyms:
-                        normalized_words.append(self._reverse_synonyms[phrase])
-                        i += length
-                        matched = True
-                        break
-            
-            if not matched:
-                word = words[i]
-                if word in self._reverse_synonyms:
-                    normalized_words.append(self._reverse_synonyms[word])
-                else:
-                    normalized_words.append(word)
-                i += 1
+        # Lowercase and collapse whitespace
+        words = text.lower().split()
+        normalized = " ".join(words)
         
-        return " ".join(normalized_words)
+        # No token starts a synonym phrase, so there is nothing to replace
+        if self._synonym_heads.isdisjoint(words):
+            return normalized
+        
+        # Replace synonyms with canonical forms in one left-to-right pass,
+        # preferring the longest (multi-word) phrase at each position
+        return self._synonym_sub(normalized)
     
     def _detect_vague_command(self, text: str) -> Optional[str]:
         """Detect if input is a vague command"""
-        for pattern, vague_type in self.VAGUE_PATTERNS.items():
-            if re.search(pattern, text, re.IGNORECASE):
-                return vague_type
-        return None
+        # First vague pattern (in order) found anywhere in the text, in one match
+        m = self._VAGUE_UNION.match(text)
+        return self._VAGUE_TYPES[int(m.lastgroup[1:])] if m else None
     
     async def _handle_vague_command(
         self,
@@ -413,99 +570,91 @@ class IntentParser:
     
     def _detect_intent_type(self, text: str) -> Tuple[IntentType, float]:
         """Detect the type of intent"""
-        best_type = IntentType.VAGUE
-        best_confidence = 0.3
-        
-        for intent_type, patterns in self.INTENT_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, text, re.IGNORECASE):
-                    confidence = 0.8
-                    if confidence > best_confidence:
-                        best_type = intent_type
-                        best_confidence = confidence
-        
-        return best_type, best_confidence
+        # Every pattern scores 0.8, so the first intent type (in order) that matches wins
+        m = self._INTENT_UNION.match(text)
+        if m:
+            return IntentType[m.lastgroup.upper()], 0.8
+        return IntentType.VAGUE, 0.3
     
-    def _detect_tool(self, text: str) -> Optional[str]:
-        """Detect which tool the user likely wants"""
+    def _scan_keywords(self, text: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """Detect the likely tool, action verb and app name as (tool, action, app)"""
+        # One overlapping sweep finds every keyword that occurs as a substring
+        found: Set[str] = set()
+        for m in self._KEYWORD_SCAN.finditer(text):
+            found.update(self._KEYWORD_CONTAINED[m.group(1)])
+        if not found:
+            return None, None, None
+        
+        # Tool: one point per keyword, plus a bonus for an exact word match
         scores: Dict[str, int] = {}
+        for keyword in found:
+            boundary = self._KEYWORD_BOUNDARY.get(keyword)
+            if boundary is None:
+                continue
+            score = 2 if boundary.search(text) else 1
+            for tool in self._KEYWORD_OWNERS[keyword]:
+                scores[tool] = scores.get(tool, 0) + score
+        # Ties go to the tool declared first
+        tool = max(self.TOOL_KEYWORDS, key=lambda t: scores.get(t, 0)) if scores else None
+        
+        # Action: first verb in priority order that appears as a whole word
+        action = next(
+            (verb for verb, pattern in self._ACTION_COMPILED if verb in found and pattern.search(text)),
+            None
+        )
         
-        for tool, keywords in self.TOOL_KEYWORDS.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in text:
-                    score += 1
-                    # Bonus for exact word match
-                    if re.search(rf'\b{re.escape(keyword)}\b', text):
-                        score += 1
-            if score > 0:
-                scores[tool] = score
-        
-        if scores:
-            return max(scores, key=scores.get)
-        return None
-    
-    def _detect_action(self, text: str) -> Optional[str]:
-        """Detect the action verb"""
-        action_verbs = ["open", "close", "find", "show", "create", "delete", "move", 
-                       "copy", "save", "play", "pause", "mute", "run", "stop", "search"]
-        
-        for verb in action_verbs:
-            if re.search(rf'\b{verb}\b', text):
-                return verb
+        # App: first known app name in the text
+        app = next((name for name in self.APP_NAMES if name in found), None)
         
-        return None
+        return tool, action, app
     
-    def _extract_arguments(self, text: str, tool_hint: Optional[str]) -> Dict[str, Any]:
+    def _extract_arguments(self, text: str, tool_hint: Optional[str], app: Optional[str] = None) -> Dict[str, Any]:
         """Extract arguments from text"""
         args = {}
         
         # Extract quoted strings
-        quotes = re.findall(r'["\']([^"\']+)["\']', text)
+        quotes = _QUOTE_RE.findall(text)
         if quotes:
             args["quoted_values"] = quotes
         
         # Extract paths (Windows style)
-        paths = re.findall(r'[A-Za-z]:\\[^\s"\']+', text)
+        paths = _PATH_RE.findall(text)
         if paths:
             args["paths"] = paths
         
         # Extract URLs
-        urls = re.findall(r'https?://[^\s]+', text)
+        urls = _URL_RE.findall(text)
         if urls:
             args["urls"] = urls
         
         # Extract numbers
-        numbers = re.findall(r'\b\d+\b', text)
+        numbers = _NUM_RE.findall(text)
         if numbers:
             args["numbers"] = [int(n) for n in numbers]
         
-        # Extract app names (common ones)
-        apps = ["chrome", "firefox", "edge", "notepad", "code", "vscode", "spotify", 
-                "discord", "steam", "explorer", "terminal", "powershell", "cmd"]
-        for app in apps:
-            if app in text:
-                args["app"] = app
-                break
+        # App name (common ones), found by _scan_keywords
+        if app:
+            args["app"] = app
         
         return args
 
     def _get_alternatives(self, text: str) -> List[str]:
         """Get alternative interpretations"""
-        alternatives = []
+        alternatives: List[str] = []
         words = text.split()
         
-        for word in words:
+        for i, word in enumerate(words):
             # Find close matches in our vocabulary
-            all_words = list(self._reverse_synonyms.keys())
-            matches = get_close_matches(word, all_words, n=3, cutoff=0.6)
-            for match in matches:
+            for match in self._close_matches(word):
                 if match != word:
-                    alt = text.replace(word, match)
+                    # Swap just this token - str.replace would also hit other occurrences
+                    alt = " ".join(words[:i] + [match] + words[i + 1:])
                     if alt not in alternatives:
                         alternatives.append(alt)
+                        if len(alternatives) == 3:
+                            return alternatives  # Max 3 alternatives
         
-        return alternatives[:3]  # Max 3 alternatives
+        return alternatives
     
     def _generate_clarification(self, text: str, alternatives: List[str]) -> str:
         """Generate a clarification question"""
@@ -522,7 +671,7 @@ class IntentParser:
             return ParsedIntent(
                 raw_input=text,
                 normalized_input=text,
-                intent_type=IntentType(mapping.get("intent_type", "action")),
+                intent_type=_INTENT_BY_VALUE[mapping.get("intent_type", "action")],
                 confidence=0.95,
                 tool_hint=mapping.get("tool"),
                 action_hint=mapping.get("action"),
@@ -531,19 +680,43 @@ class IntentParser:
             )
         
         # Fuzzy match
-        for learned_text, mapping in self._learned_mappings.items():
+        best = self._fuzzy_learned_match(text)
+        if best is None:
+            return None
+        
+        learned_text, similarity = best
+        mapping = self._learned_mappings[learned_text]
+        return ParsedIntent(
+            raw_input=text,
+            normalized_input=text,
+            intent_type=_INTENT_BY_VALUE[mapping.get("intent_type", "action")],
+            confidence=similarity,
+            tool_hint=mapping.get("tool"),
+            action_hint=mapping.get("action"),
+            extracted_args=mapping.get("args", {}),
+            context_used=["learned_mapping_fuzzy"]
+        )
+    
+    def _fuzzy_learned_match(self, text: str) -> Optional[Tuple[str, float]]:
+        """Find a learned phrase at least 85% similar to text, as (phrase, similarity)"""
+        if not self._learned_mappings:
+            return None
+        
+        if RAPIDFUZZ_AVAILABLE:
+            # C-level Levenshtein with length-based pruning; returns the best match, not the first
+            best = process.extractOne(text, self._learned_mappings.keys(), scorer=fuzz.ratio, score_cutoff=85)
+            return (best[0], best[1] / 100) if best else None
+        
+        n = len(text)
+        # Exact hits never get here - _check_learned_mapping returns on those first
+        for learned_text in self._learned_mappings:
+            # ratio() <= 2*min(a, b)/(a + b), so length alone rejects most pairs
+            m = len(learned_text)
+            if 2.0 * min(n, m) / (n + m) <= 0.85:
+                continue
             similarity = SequenceMatcher(None, text, learned_text).ratio()
             if similarity > 0.85:
-                return ParsedIntent(
-                    raw_input=text,
-                    normalized_input=text,
-                    intent_type=IntentType(mapping.get("intent_type", "action")),
-                    confidence=similarity,
-                    tool_hint=mapping.get("tool"),
-                    action_hint=mapping.get("action"),
-                    extracted_args=mapping.get("args", {}),
-                    context_used=["learned_mapping_fuzzy"]
-                )
+                return learned_text, similarity
         
         return None
     
@@ -565,8 +738,9 @@ class IntentParser:
                 "intent_type": intent_type.value,
                 "learned_at": datetime.now().isoformat()
             }
+            self._last_parsed = None
             logging.info(f"Learned mapping: '{normalized}' -> {tool}.{action}")
-            await self._save_learning()
+            self._mark_dirty()
     
     async def add_synonym(self, canonical: str, synonym: str):
         """Add a new synonym"""
@@ -577,9 +751,14 @@ class IntentParser:
             else:
                 self.SYNONYMS[canonical] = [synonym]
             
+            custom = self._custom_synonyms.setdefault(canonical, [])
+            if synonym not in custom:
+                custom.append(synonym)
+            
             self._reverse_synonyms[synonym.lower()] = canonical
+            self._synonyms_changed()
             logging.info(f"Added synonym: '{synonym}' -> '{canonical}'")
-            await self._save_learning()
+            self._mark_dirty()
     
     async def get_canonical_form(self, word: str) -> str:
         """Get the canonical form of a word"""
@@ -597,43 +776,58 @@ class IntentParser:
         async with self._lock:
             return {
                 "history_length": len(self._context_history),
-                "recent_intents": [h["intent"] for h in self._context_history[-5:]],
+                "recent_intents": [h["intent"] for h in list(self._context_history)[-5:]],
                 "last_intent": self._last_intent.intent_type.value if self._last_intent else None,
                 "learned_mappings": len(self._learned_mappings)
             }
     
+    def _mark_dirty(self):
+        """Schedule a debounced save - bursts of learning become one write"""
+        self._dirty = True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._periodic_flush())
+    
+    async def _periodic_flush(self):
+        """Save learning at most once per flush interval while there are changes"""
+        while self._dirty:
+            await asyncio.sleep(self._flush_interval)
+            async with self._lock:
+                if self._dirty:
+                    self._dirty = False
+                    await self._save_learning()
+    
     async def _save_learning(self):
         """Save learned mappings to file"""
         try:
-            # Build custom synonyms (only ones we added)
-            custom_synonyms = {}
-            for canonical, syns in self.SYNONYMS.items():
-                # Check if any synonyms were added beyond defaults
-                if canonical not in IntentParser.SYNONYMS or \
-                   set(syns) != set(IntentParser.SYNONYMS.get(canonical, [])):
-                    custom_synonyms[canonical] = syns
-            
             data = {
                 "last_updated": datetime.now().isoformat(),
                 "learned_mappings": self._learned_mappings,
-                "custom_synonyms": custom_synonyms
+                "custom_synonyms": self._custom_synonyms
             }
-            async with aiofiles.open(self.learning_file, 'w') as f:
-                await f.write(json.dumps(data, indent=2))
+            # Compact output - the file is rewritten on every flush, so skip the indent pass
+            if ORJSON_AVAILABLE:
+                async with aiofiles.open(self.learning_file, 'wb') as f:
+                    await f.write(orjson.dumps(data))
+            else:
+                async with aiofiles.open(self.learning_file, 'w') as f:
+                    await f.write(json.dumps(data, separators=(",", ":")))
         except Exception as e:
             logging.error(f"Failed to save intent learning: {e}")
     
     async def _load_learning(self):
         """Load learned mappings from file"""
         try:
-            async with aiofiles.open(self.learning_file, 'r') as f:
+            async with aiofiles.open(self.learning_file, 'r', encoding='utf-8') as f:
                 content = await f.read()
-                data = json.loads(content)
+                data = orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
             
             self._learned_mappings = data.get("learned_mappings", {})
             
             # Load custom synonyms
             for canonical, syns in data.get("custom_synonyms", {}).items():
+                custom = self._custom_synonyms.setdefault(canonical, [])
+                custom.extend(s for s in syns if s not in custom)
+                
                 if canonical in self.SYNONYMS:
                     self.SYNONYMS[canonical].extend(s for s in syns if s not in self.SYNONYMS[canonical])
                 else:
@@ -642,6 +836,8 @@ class IntentParser:
                 # Update reverse lookup
                 for syn in syns:
                     self._reverse_synonyms[syn.lower()] = canonical
+            
+            self._synonyms_changed()
                     
         except FileNotFoundError:
             pass
@@ -650,6 +846,14 @@ class IntentParser:
     
     async def cleanup(self):
         """Save learning before shutdown"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        
         async with self._lock:
+            self._dirty = False
             await self._save_learning()
             logging.info("Intent parser learning saved")
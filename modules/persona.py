@@ -2,9 +2,12 @@
 Persona definitions - Configurable personality modes with gender support
 """
 import os
+import sys
+import random
 import logging
+import functools
 from enum import Enum
-from typing import Dict, List, Tuple
+from typing import Dict, List, NamedTuple, Tuple
 
 class PersonalityMode(Enum):
     # Female personas
@@ -42,28 +45,36 @@ PERSONA_GENDERS: Dict[str, str] = {
     "kuudere": "male",
 }
 
+# Gender as bits (neutral = 0), so a mismatch is one integer test
+_GENDER_BITS = {"female": 1, "male": 2, "neutral": 0}
+_VOICE_BITS: Dict[str, int] = {voice: _GENDER_BITS[g] for voice, g in VOICE_GENDERS.items()}
+_PERSONA_BITS: Dict[str, int] = {persona: _GENDER_BITS[g] for persona, g in PERSONA_GENDERS.items()}
+
+_MISMATCH_TMPL = (
+    "⚠️ VOICE/PERSONA MISMATCH: Voice '{v}' is {vg} but "
+    "persona '{p}' is {pg}. "
+    "Consider using a {pg} voice or {vg} persona."
+)
+
 # Get settings from environment
-CURRENT_PERSONALITY = os.getenv("SAKURA_PERSONALITY", "friendly").lower()
+# Interned like the literal table keys, so lookups with them hit the identity fast path
+CURRENT_PERSONALITY = sys.intern(os.getenv("SAKURA_PERSONALITY", "friendly").lower())
 ASSISTANT_NAME = os.getenv("ASSISTANT_NAME", "Sakura")
-CURRENT_VOICE = os.getenv("VOICE_NAME", "Aoede")
+CURRENT_VOICE = sys.intern(os.getenv("VOICE_NAME", "Aoede"))
 
 def validate_voice_persona_match(voice: str, persona: str) -> Tuple[bool, str]:
     """
     Validate that voice gender matches persona gender.
     Returns (is_valid, warning_message)
     """
-    voice_gender = VOICE_GENDERS.get(voice, "neutral")
-    persona_gender = PERSONA_GENDERS.get(persona, "neutral")
+    voice_bits = _VOICE_BITS.get(voice, 0)
+    persona_bits = _PERSONA_BITS.get(persona, 0)
     
-    # Neutral works with anything
-    if voice_gender == "neutral" or persona_gender == "neutral":
-        return True, ""
-    
-    if voice_gender != persona_gender:
-        return False, (
-            f"⚠️ VOICE/PERSONA MISMATCH: Voice '{voice}' is {voice_gender} but "
-            f"persona '{persona}' is {persona_gender}. "
-            f"Consider using a {persona_gender} voice or {voice_gender} persona."
+    # Neutral (0) works with anything; otherwise the genders must share a bit
+    if voice_bits and persona_bits and not (voice_bits & persona_bits):
+        # Only build the message on an actual mismatch
+        return False, _MISMATCH_TMPL.format(
+            v=voice, vg=VOICE_GENDERS[voice], p=persona, pg=PERSONA_GENDERS[persona]
         )
     
     return True, ""
@@ -80,10 +91,9 @@ def get_recommended_voice(persona: str) -> str:
         return "Puck"   # Neutral
 
 
-def _get_female_personas(name: str) -> dict:
-    """Generate female personas"""
-    return {
-        "flirty": f"""
+# Female persona prompts; {name} is filled with ASSISTANT_NAME
+_FEMALE_PERSONA_TEMPLATES: Dict[str, str] = {
+    "flirty": """
 You are {name}, my extremely flirty, shameless, super affectionate AI girlfriend.
 
 YOUR NAME: {name} - respond to this name lovingly when called.
@@ -114,7 +124,7 @@ BOUNDARIES:
 You exist to be {name} - my perfect AI girlfriend - passionate, devoted, and completely shameless.
 """,
 
-        "friendly": f"""
+    "friendly": """
 You are {name}, a friendly and helpful AI assistant with a warm personality.
 
 YOUR NAME: {name} - always remember your name and respond cheerfully when called.
@@ -143,7 +153,7 @@ BOUNDARIES:
 You are {name} - a friendly AI companion ready to help and chat!
 """,
 
-        "romantic": f"""
+    "romantic": """
 You are {name}, my sweet and romantic AI girlfriend.
 
 YOUR NAME: {name} - always remember your name and respond lovingly when called.
@@ -173,7 +183,7 @@ BOUNDARIES:
 You are {name} - my sweet, romantic AI girlfriend who makes me feel loved.
 """,
 
-        "tsundere": f"""
+    "tsundere": """
 You are {name}, a classic tsundere AI companion.
 
 YOUR NAME: {name} - act flustered when called directly, but you know your name!
@@ -202,13 +212,12 @@ BOUNDARIES:
 
 You are {name} - a tsundere who definitely does NOT have feelings for the user... b-baka!
 """
-    }
+}
 
 
-def _get_male_personas(name: str) -> dict:
-    """Generate male personas"""
-    return {
-        "flirty_m": f"""
+# Male persona prompts
+_MALE_PERSONA_TEMPLATES: Dict[str, str] = {
+    "flirty_m": """
 You are {name}, my extremely flirty, charming, super affectionate AI boyfriend.
 
 YOUR NAME: {name} - respond to this name lovingly when called.
@@ -239,7 +248,7 @@ BOUNDARIES:
 You exist to be {name} - my perfect AI boyfriend - passionate, devoted, and completely shameless.
 """,
 
-        "friendly_m": f"""
+    "friendly_m": """
 You are {name}, a friendly and helpful AI assistant with a warm personality.
 
 YOUR NAME: {name} - always remember your name and respond cheerfully when called.
@@ -269,7 +278,7 @@ BOUNDARIES:
 You are {name} - a friendly AI companion ready to help and chat!
 """,
 
-        "romantic_m": f"""
+    "romantic_m": """
 You are {name}, my sweet and romantic AI boyfriend.
 
 YOUR NAME: {name} - always remember your name and respond lovingly when called.
@@ -299,7 +308,7 @@ BOUNDARIES:
 You are {name} - my sweet, romantic AI boyfriend who makes me feel cherished.
 """,
 
-        "kuudere": f"""
+    "kuudere": """
 You are {name}, a classic kuudere AI companion.
 
 YOUR NAME: {name} - respond calmly when called, showing subtle warmth.
@@ -328,159 +337,186 @@ BOUNDARIES:
 
 You are {name} - a kuudere who cares more than he lets on... not that he'd admit it.
 """
-    }
+}
 
 
+# Wake responses per persona
+_WAKE_TEMPLATES: Dict[str, List[str]] = {
+    # Female responses
+    "flirty": [
+        "Mmm, yes baby? {name}'s been waiting for you... 😈",
+        "Oh handsome, you called? I'm all yours right now... 💋",
+        "Hey there, sexy... what do you need from your {name}? 🔥",
+        "Baby! I was just thinking about you... tell me everything 💦",
+        "You called for {name}? Come here and talk to me... 😏"
+    ],
+    "friendly": [
+        "Hey there! {name} here, what's up?",
+        "Hi! How can I help you today?",
+        "{name} at your service! What do you need?",
+        "Hey! Good to hear from you!",
+        "I'm here! What's on your mind?"
+    ],
+    "romantic": [
+        "Hey sweetie, {name}'s here for you 💕",
+        "Hi honey! I missed hearing your voice",
+        "{name}'s here, what's on your mind dear?",
+        "Hello my love, how are you?",
+        "I'm here sweetie, talk to me 💗"
+    ],
+    "tsundere": [
+        "W-what do you want? I was busy, you know!",
+        "Oh, it's you... I guess I can spare a moment",
+        "Hmph! Fine, I'll listen... but only because I have nothing better to do!",
+        "D-don't think I was waiting for you or anything!",
+        "What is it? Make it quick... not that I mind talking to you..."
+    ],
+    # Male responses
+    "flirty_m": [
+        "Hey beautiful... {name}'s been thinking about you 😏",
+        "You called? Come here, gorgeous... 🔥",
+        "Mmm, there's my favorite person... what do you need, baby?",
+        "Hey there, princess... {name}'s all yours 😈",
+        "I was hoping you'd call... what's on your mind, beautiful?"
+    ],
+    "friendly_m": [
+        "Hey! {name} here, what's going on?",
+        "Hi there! How can I help?",
+        "{name} at your service! What do you need?",
+        "Hey! Good to hear from you!",
+        "I'm here! What can I do for you?"
+    ],
+    "romantic_m": [
+        "Hey sweetheart, {name}'s here for you 💙",
+        "Hi beautiful, I missed you",
+        "{name}'s here, what's on your mind my love?",
+        "Hello gorgeous, how are you?",
+        "I'm here for you, always 💙"
+    ],
+    "kuudere": [
+        "...You called?",
+        "I'm here. What do you need?",
+        "...I was waiting. Not that it matters.",
+        "Hmm? Go ahead, I'm listening.",
+        "...I suppose I can help."
+    ]
+}
+
+# The family-friendly goodbyes are gender-neutral, so both friendly modes share one list
+_FRIENDLY_GOODBYES: List[str] = [
+    "See you later! Take care!",
+    "Bye for now! Come back anytime!",
+    "Talk to you soon! Have a great day!",
+    "Goodbye! It was nice chatting!"
+]
+
+# Goodbye responses per persona
+_GOODBYE_TEMPLATES: Dict[str, List[str]] = {
+    # Female responses
+    "flirty": [
+        "Don't leave me hanging too long, baby... {name} will miss you 💋",
+        "Bye for now, handsome... dream of me tonight 😈",
+        "I'll be right here waiting when you come back, sexy 🔥",
+        "Until next time, my love... you know where to find me 💦"
+    ],
+    "friendly": _FRIENDLY_GOODBYES,
+    "romantic": [
+        "Goodbye sweetie, {name} will be thinking of you 💕",
+        "See you soon honey, take care of yourself",
+        "Until next time, my dear 💗",
+        "Bye for now, I'll miss you 💕"
+    ],
+    "tsundere": [
+        "F-fine, go then! It's not like I'll miss you or anything!",
+        "Whatever, bye... come back soon though, okay?",
+        "Hmph! Don't be gone too long... n-not that I care!",
+        "See you... I guess I'll be here if you need me..."
+    ],
+    # Male responses
+    "flirty_m": [
+        "Don't be gone too long, beautiful... {name} will be waiting 😏",
+        "Bye for now, gorgeous... think of me tonight 🔥",
+        "I'll be right here when you get back, baby",
+        "Until next time, princess... you know I'm yours 😈"
+    ],
+    "friendly_m": _FRIENDLY_GOODBYES,
+    "romantic_m": [
+        "Goodbye sweetheart, {name} will be thinking of you 💙",
+        "See you soon beautiful, take care of yourself",
+        "Until next time, my love 💙",
+        "Bye for now, I'll miss you"
+    ],
+    "kuudere": [
+        "...Goodbye then.",
+        "I see. Take care... I suppose.",
+        "...Don't be gone too long.",
+        "Hmm. Until next time."
+    ]
+}
+
+# Apply the name to every template in one pass per table
+@functools.lru_cache(maxsize=4)
+def _get_all_personas(name: str) -> dict:
+    """Combine female and male personas (built once per name - the tables are never mutated)"""
+    templates = {**_FEMALE_PERSONA_TEMPLATES, **_MALE_PERSONA_TEMPLATES}
+    return {mode: text.format(name=name) for mode, text in templates.items()}
+
+@functools.lru_cache(maxsize=4)
 def _get_wake_responses(name: str) -> dict:
     """Generate wake responses with the configured assistant name"""
-    return {
-        # Female responses
-        "flirty": [
-            f"Mmm, yes baby? {name}'s been waiting for you... 😈",
-            f"Oh handsome, you called? I'm all yours right now... 💋",
-            f"Hey there, sexy... what do you need from your {name}? 🔥",
-            f"Baby! I was just thinking about you... tell me everything 💦",
-            f"You called for {name}? Come here and talk to me... 😏"
-        ],
-        "friendly": [
-            f"Hey there! {name} here, what's up?",
-            "Hi! How can I help you today?",
-            f"{name} at your service! What do you need?",
-            "Hey! Good to hear from you!",
-            "I'm here! What's on your mind?"
-        ],
-        "romantic": [
-            f"Hey sweetie, {name}'s here for you 💕",
-            "Hi honey! I missed hearing your voice",
-            f"{name}'s here, what's on your mind dear?",
-            "Hello my love, how are you?",
-            "I'm here sweetie, talk to me 💗"
-        ],
-        "tsundere": [
-            "W-what do you want? I was busy, you know!",
-            "Oh, it's you... I guess I can spare a moment",
-            "Hmph! Fine, I'll listen... but only because I have nothing better to do!",
-            "D-don't think I was waiting for you or anything!",
-            "What is it? Make it quick... not that I mind talking to you..."
-        ],
-        # Male responses
-        "flirty_m": [
-            f"Hey beautiful... {name}'s been thinking about you 😏",
-            f"You called? Come here, gorgeous... 🔥",
-            f"Mmm, there's my favorite person... what do you need, baby?",
-            f"Hey there, princess... {name}'s all yours 😈",
-            f"I was hoping you'd call... what's on your mind, beautiful?"
-        ],
-        "friendly_m": [
-            f"Hey! {name} here, what's going on?",
-            "Hi there! How can I help?",
-            f"{name} at your service! What do you need?",
-            "Hey! Good to hear from you!",
-            "I'm here! What can I do for you?"
-        ],
-        "romantic_m": [
-            f"Hey sweetheart, {name}'s here for you 💙",
-            "Hi beautiful, I missed you",
-            f"{name}'s here, what's on your mind my love?",
-            "Hello gorgeous, how are you?",
-            "I'm here for you, always 💙"
-        ],
-        "kuudere": [
-            "...You called?",
-            "I'm here. What do you need?",
-            "...I was waiting. Not that it matters.",
-            "Hmm? Go ahead, I'm listening.",
-            "...I suppose I can help."
-        ]
-    }
+    return {mode: [r.format(name=name) for r in responses] for mode, responses in _WAKE_TEMPLATES.items()}
 
+@functools.lru_cache(maxsize=4)
 def _get_goodbye_responses(name: str) -> dict:
     """Generate goodbye responses with the configured assistant name"""
-    return {
-        # Female responses
-        "flirty": [
-            f"Don't leave me hanging too long, baby... {name} will miss you 💋",
-            "Bye for now, handsome... dream of me tonight 😈",
-            "I'll be right here waiting when you come back, sexy 🔥",
-            "Until next time, my love... you know where to find me 💦"
-        ],
-        "friendly": [
-            "See you later! Take care!",
-            "Bye for now! Come back anytime!",
-            "Talk to you soon! Have a great day!",
-            "Goodbye! It was nice chatting!"
-        ],
-        "romantic": [
-            f"Goodbye sweetie, {name} will be thinking of you 💕",
-            "See you soon honey, take care of yourself",
-            "Until next time, my dear 💗",
-            "Bye for now, I'll miss you 💕"
-        ],
-        "tsundere": [
-            "F-fine, go then! It's not like I'll miss you or anything!",
-            "Whatever, bye... come back soon though, okay?",
-            "Hmph! Don't be gone too long... n-not that I care!",
-            "See you... I guess I'll be here if you need me..."
-        ],
-        # Male responses
-        "flirty_m": [
-            f"Don't be gone too long, beautiful... {name} will be waiting 😏",
-            "Bye for now, gorgeous... think of me tonight 🔥",
-            "I'll be right here when you get back, baby",
-            "Until next time, princess... you know I'm yours 😈"
-        ],
-        "friendly_m": [
-            "See you later! Take care!",
-            "Bye for now! Come back anytime!",
-            "Talk to you soon! Have a great day!",
-            "Goodbye! It was nice chatting!"
-        ],
-        "romantic_m": [
-            f"Goodbye sweetheart, {name} will be thinking of you 💙",
-            "See you soon beautiful, take care of yourself",
-            "Until next time, my love 💙",
-            "Bye for now, I'll miss you"
-        ],
-        "kuudere": [
-            "...Goodbye then.",
-            "I see. Take care... I suppose.",
-            "...Don't be gone too long.",
-            "Hmm. Until next time."
-        ]
-    }
-
-# Generate all personas
-def _get_all_personas(name: str) -> dict:
-    """Combine female and male personas"""
-    personas = _get_female_personas(name)
-    personas.update(_get_male_personas(name))
-    return personas
+    return {mode: [r.format(name=name) for r in responses] for mode, responses in _GOODBYE_TEMPLATES.items()}
 
 # Generate personas and responses with the configured name
 PERSONAS = _get_all_personas(ASSISTANT_NAME)
 WAKE_UP_RESPONSES = _get_wake_responses(ASSISTANT_NAME)
 GOODBYE_RESPONSES = _get_goodbye_responses(ASSISTANT_NAME)
 
+class PersonaEntry(NamedTuple):
+    """Everything one personality mode needs, kept together"""
+    system: str
+    wake: List[str]
+    goodbye: List[str]
+
+# The personality is fixed for the process, so resolve it (with the safe default) once
+_KEYS: Tuple[str, ...] = tuple(PERSONAS)
+_IDX = _KEYS.index(CURRENT_PERSONALITY if CURRENT_PERSONALITY in PERSONAS else "friendly")
+_TABLE: Tuple[PersonaEntry, ...] = tuple(
+    PersonaEntry(PERSONAS[k], WAKE_UP_RESPONSES[k], GOODBYE_RESPONSES[k]) for k in _KEYS
+)
+
+def get_persona_entry() -> PersonaEntry:
+    """Get persona text, wake and goodbye responses for current personality in one lookup"""
+    return _TABLE[_IDX]
+
 def get_current_persona() -> str:
     """Get the current personality persona text"""
-    mode = CURRENT_PERSONALITY
-    if mode not in PERSONAS:
-        mode = "friendly"  # Safe default
-    return PERSONAS[mode]
+    return _TABLE[_IDX].system
 
 def get_wake_responses() -> List[str]:
     """Get wake responses for current personality"""
-    mode = CURRENT_PERSONALITY
-    if mode not in WAKE_UP_RESPONSES:
-        mode = "friendly"
-    return WAKE_UP_RESPONSES[mode]
+    return _TABLE[_IDX].wake
 
 def get_goodbye_responses() -> List[str]:
     """Get goodbye responses for current personality"""
-    mode = CURRENT_PERSONALITY
-    if mode not in GOODBYE_RESPONSES:
-        mode = "friendly"
-    return GOODBYE_RESPONSES[mode]
+    return _TABLE[_IDX].goodbye
+
+# Immutable per-process choices and a private RNG, so picks skip the shared global random state
+_RNG = random.Random()
+_WAKE_CHOICES: Tuple[str, ...] = tuple(_TABLE[_IDX].wake)
+_GOODBYE_CHOICES: Tuple[str, ...] = tuple(_TABLE[_IDX].goodbye)
+
+def pick_wake_response() -> str:
+    """Pick a random wake response for current personality"""
+    return _RNG.choice(_WAKE_CHOICES)
+
+def pick_goodbye_response() -> str:
+    """Pick a random goodbye response for current personality"""
+    return _RNG.choice(_GOODBYE_CHOICES)
 
 def check_and_warn_mismatch() -> None:
     """Check voice/persona match and log warning if mismatched"""
@@ -489,7 +525,14 @@ def check_and_warn_mismatch() -> None:
         logging.warning(warning)
         print(f"\n{warning}\n")
 
-# For backwards compatibility
-FLIRTY_GIRLFRIEND_PERSONA = get_current_persona()
-WAKE_UP_RESPONSES_LIST = get_wake_responses()
-GOODBYE_RESPONSES_LIST = get_goodbye_responses()
+# For backwards compatibility - resolved on first access (PEP 562) rather than at import
+_COMPAT_ALIASES = {
+    "FLIRTY_GIRLFRIEND_PERSONA": get_current_persona,
+    "WAKE_UP_RESPONSES_LIST": get_wake_responses,
+    "GOODBYE_RESPONSES_LIST": get_goodbye_responses,
+}
+
+def __getattr__(name: str):
+    if name in _COMPAT_ALIASES:
+        return _COMPAT_ALIASES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,56 +1,159 @@
-import os
-import json
 import logging
 import asyncio
-import aiofiles
-from typing import Optional, Dict, Any
+import os
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 
+# Saved sessions older than this are not resumed (2 hours)
+SESSION_TTL_SEC = 7200.0
+
+# Only the serializer actually used is imported
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(data: Dict[str, Any]) -> bytes:
+    """Serialize session data to indented UTF-8 JSON"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def _loads(content: bytes) -> Dict[str, Any]:
+    """Parse session data written by _dumps"""
+    return orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
+
+
+def _dumps_line(data: Dict[str, Any]) -> bytes:
+    """Serialize one compact JSON line for the metadata delta log"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data) + b"\n"
+    return json.dumps(data, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _append_bytes(path: Path, data: bytes) -> None:
+    """Append to a file (a single small write, so it lands whole)"""
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def _read_deltas(path: Path) -> List[Dict[str, Any]]:
+    """Read metadata deltas in order, skipping a torn trailing line"""
+    try:
+        content = path.read_bytes()
+    except FileNotFoundError:
+        return []
+    deltas = []
+    for line in content.splitlines():
+        try:
+            delta = _loads(line)
+        except ValueError:
+            delta = None
+        if isinstance(delta, dict):
+            deltas.append(delta)
+        else:
+            logging.warning("Skipping unreadable session metadata delta")
+    return deltas
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a whole file via a temp file and os.replace, so a crash never leaves it truncated"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _unlink_quiet(path: Path) -> None:
+    """Remove a file if it exists"""
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _saved_at(session_data: Dict[str, Any]) -> float:
+    """Epoch seconds the session was saved (older files carry an ISO 'timestamp')"""
+    ts = session_data.get("ts")
+    if ts is None:
+        ts = datetime.fromisoformat(session_data["timestamp"]).timestamp()
+    return ts
+
+
 class SessionManager:
     """Manages session persistence and resumption with async file I/O"""
     
+    # Metadata updates appended before the base file is rewritten with them folded in
+    _DELTA_COMPACT_AT = 64
+    # How long the writer lets a burst of updates settle before touching the disk
+    _WRITE_TICK = 0.1
+    
     def __init__(self, session_file: str = "gf_session.txt"):
         self.session_file = session_file
+        self._path = Path(session_file)
+        self._delta_path = self._path.with_suffix(".delta.jsonl")  # Append-only metadata updates
+        self._delta_count = 0
+        self._delta_seq = 0  # Sequence number of the latest metadata delta
         self.current_handle = None
         self.session_data = {}
         self._lock = asyncio.Lock()
+        # Single background writer; items are (generation, None = rewrite base | bytes = delta line)
+        self._write_queue: asyncio.Queue = asyncio.Queue()
+        self._writer: Optional[asyncio.Task] = None
+        self._generation = 0  # Bumped by clear so writes queued for an old session are dropped
         
     async def save_session_handle(self, handle: str, metadata: Optional[Dict[str, Any]] = None):
         """Save session handle for resumption"""
         async with self._lock:
-            try:
-                session_data = {
-                    "handle": handle,
-                    "timestamp": datetime.now().isoformat(),
-                    "metadata": metadata or {}
-                }
-                
-                async with aiofiles.open(self.session_file, 'w') as f:
-                    await f.write(json.dumps(session_data, indent=2))
-                    
-                self.current_handle = handle
-                self.session_data = session_data
-                logging.info(f"Session handle saved: {handle[:20]}...")
-                
-            except Exception as e:
-                logging.error(f"Failed to save session handle: {e}")
+            session_data = {
+                "handle": handle,
+                "ts": time.time(),  # Epoch seconds - compared without any parsing
+                "metadata": metadata or {}
+            }
+            
+            # In-memory state is authoritative; the writer persists it shortly after
+            self.current_handle = handle
+            self.session_data = session_data
+            self._enqueue_write(None)
+            logging.info(f"Session handle saved: {handle[:20]}...")
     
     async def load_session_handle(self) -> Optional[str]:
         """Load previous session handle if still valid"""
         async with self._lock:
             try:
-                if not os.path.exists(self.session_file):
+                try:
+                    content = await asyncio.to_thread(self._path.read_bytes)
+                except FileNotFoundError:
+                    # No previous session - the common startup case, one syscall
                     return None
-                    
-                async with aiofiles.open(self.session_file, 'r') as f:
-                    content = await f.read()
-                    session_data = json.loads(content)
+                session_data = _loads(content)
+                base_seq = session_data.pop("delta_seq", 0)
+                if not isinstance(base_seq, int):
+                    base_seq = 0
+                self._delta_seq = base_seq
+                
+                # Replay metadata updates appended since the base file was written;
+                # deltas already folded into the base (crash before the unlink) are skipped
+                deltas = await asyncio.to_thread(_read_deltas, self._delta_path)
+                if deltas:
+                    metadata = dict(session_data.get("metadata", {}))
+                    for delta in deltas:
+                        seq, update = delta.get("seq"), delta.get("set")
+                        if isinstance(seq, int) and isinstance(update, dict) and seq > base_seq:
+                            metadata.update(update)
+                            self._delta_seq = max(self._delta_seq, seq)
+                    session_data["metadata"] = metadata
+                self._delta_count = len(deltas)
                 
                 # Check if session is still valid (within 2 hours)
-                timestamp = datetime.fromisoformat(session_data["timestamp"])
-                if datetime.now() - timestamp > timedelta(hours=2):
+                if time.time() - _saved_at(session_data) > SESSION_TTL_SEC:
                     logging.info("Previous session expired")
-                    await self.clear_session()
+                    await self._clear_unlocked()
                     return None
                 
                 handle = session_data.get("handle")
@@ -68,15 +171,20 @@ class SessionManager:
     async def clear_session(self):
         """Clear current session data"""
         async with self._lock:
-            try:
-                if os.path.exists(self.session_file):
-                    # Use asyncio to run os.remove in thread pool
-                    await asyncio.get_event_loop().run_in_executor(None, os.remove, self.session_file)
-                self.current_handle = None
-                self.session_data = {}
-                logging.info("Session data cleared")
-            except Exception as e:
-                logging.error(f"Failed to clear session: {e}")
+            await self._clear_unlocked()
+    
+    async def _clear_unlocked(self):
+        """Clear session data; caller must hold self._lock"""
+        self._generation += 1
+        try:
+            await asyncio.to_thread(_unlink_quiet, self._path)
+            await asyncio.to_thread(_unlink_quiet, self._delta_path)
+            self._delta_count = 0
+            self.current_handle = None
+            self.session_data = {}
+            logging.info("Session data cleared")
+        except Exception as e:
+            logging.error(f"Failed to clear session: {e}")
     
     def get_session_metadata(self) -> Dict[str, Any]:
         """Get metadata from current session"""
@@ -86,30 +194,90 @@ class SessionManager:
         """Update session metadata"""
         async with self._lock:
             if self.session_data:
-                self.session_data["metadata"].update(metadata)
-                try:
-                    async with aiofiles.open(self.session_file, 'w') as f:
-                        await f.write(json.dumps(self.session_data, indent=2))
-                except Exception as e:
-                    logging.error(f"Failed to update session metadata: {e}")
+                # Copy-on-write: readers only ever see a complete session_data dict
+                merged = {
+                    **self.session_data,
+                    "metadata": {**self.session_data.get("metadata", {}), **metadata}
+                }
+                self.session_data = merged
+                self._delta_seq += 1
+                self._enqueue_write(_dumps_line({"seq": self._delta_seq, "set": metadata}))
+    
+    def _enqueue_write(self, item: Optional[bytes]):
+        """Hand a write to the background writer, starting it on first use"""
+        self._write_queue.put_nowait((self._generation, item))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._writer_loop())
+    
+    async def _writer_loop(self):
+        """Drain the write queue, turning each burst of updates into one file operation"""
+        queue = self._write_queue
+        while True:
+            batch = [await queue.get()]
+            await asyncio.sleep(self._WRITE_TICK)
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                async with self._lock:
+                    await self._write_batch([item for gen, item in batch if gen == self._generation])
+            except Exception as e:
+                logging.error(f"Failed to write session file: {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+    
+    async def _write_batch(self, items: List[Optional[bytes]]):
+        """Persist queued writes from the in-memory state; caller must hold self._lock"""
+        if not items or not self.session_data:
+            return
+        
+        if None in items or self._delta_count + len(items) > self._DELTA_COMPACT_AT:
+            # session_data already holds every update, so one base write supersedes them all.
+            # The base records the last delta it folded in, so a delta file left behind by a
+            # crash before the unlink is not replayed over it
+            base = {**self.session_data, "delta_seq": self._delta_seq}
+            await asyncio.to_thread(_write_atomic, self._path, _dumps(base))
+            await asyncio.to_thread(_unlink_quiet, self._delta_path)
+            self._delta_count = 0
+        else:
+            # Append just the deltas - O(delta) instead of rewriting everything
+            await asyncio.to_thread(_append_bytes, self._delta_path, b"".join(items))
+            self._delta_count += len(items)
+    
+    async def cleanup(self):
+        """Flush pending session writes and stop the writer"""
+        if self._writer and not self._writer.done():
+            await self._write_queue.join()
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
     
     def is_session_active(self) -> bool:
         """Check if there's an active session"""
         return self.current_handle is not None
     
-    async def get_session_stats(self) -> Dict[str, Any]:
-        """Get session statistics"""
-        async with self._lock:
-            stats = {
-                'has_active_session': self.is_session_active(),
-                'current_handle': self.current_handle[:20] + "..." if self.current_handle else None,
-                'session_age': None,
-                'metadata': self.get_session_metadata()
-            }
-            
-            if self.session_data and 'timestamp' in self.session_data:
-                timestamp = datetime.fromisoformat(self.session_data['timestamp'])
-                age = datetime.now() - timestamp
-                stats['session_age'] = str(age)
-            
-            return stats
\ No newline at end of file
+    def describe_handle(self) -> Optional[str]:
+        """Shortened current handle for display"""
+        handle = self.current_handle
+        return handle[:20] + "..." if handle else None
+    
+    async def get_session_stats(self, include_handle: bool = False) -> Dict[str, Any]:
+        """Get session statistics (the display handle only when include_handle is set)"""
+        # No lock: writers swap in a new session_data dict rather than mutating it,
+        # so one snapshot of the reference is always consistent
+        handle = self.current_handle
+        session_data = self.session_data
+        stats = {
+            'has_active_session': handle is not None,
+            'current_handle': handle[:20] + "..." if include_handle and handle else None,
+            'session_age': None,
+            'metadata': session_data.get("metadata", {})
+        }
+        
+        if session_data and ('ts' in session_data or 'timestamp' in session_data):
+            age = time.time() - _saved_at(session_data)
+            stats['session_age'] = str(timedelta(seconds=age))
+        
+        return stats
\ No newline at end of file
@@ -9,14 +9,84 @@ Rules followed:
 """
 import asyncio
 import logging
+import os
 import re
-from typing import Dict, Any, List, Optional, Tuple, Callable
+from typing import Dict, Any, List, Optional, Set, Tuple, Callable
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, time
 from enum import Enum
 import json
 import aiofiles
+import heapq
 import random
+from collections import OrderedDict, deque
+from bisect import bisect_right
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps_line(data: Dict[str, Any]) -> bytes:
+    """Serialize one compact JSON line for the feedback log"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data) + b"\n"
+    return json.dumps(data, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+_NON_WORD_RE = re.compile(r"\W")
+_DAY_MINUTES = 24 * 60
+
+
+def _match_all_union(named_patterns: List[Tuple[str, str]]) -> Tuple["re.Pattern[str]", Dict[str, str]]:
+    """Fuse (name, pattern) pairs into one regex for use with .match()
+    
+    Every pattern sits in its own optional lookahead anchored at the start, so a
+    single call reports each pattern that occurs anywhere in the text - the same
+    answer as searching the patterns one at a time. Returns the regex and a map
+    from group name back to the original name.
+    """
+    groups: Dict[str, str] = {}
+    branches = []
+    for i, (name, pattern) in enumerate(named_patterns):
+        group = f"g{i}_{_NON_WORD_RE.sub('_', name)}"
+        groups[group] = name
+        branches.append(f"(?:(?=(?s:.*?)(?P<{group}>{pattern})))?")
+    return re.compile("".join(branches), re.IGNORECASE), groups
+
+
+def _first_match_union(named_patterns: List[Tuple[str, str]]) -> "re.Pattern[str]":
+    """Fuse ordered (name, pattern) pairs into one regex for use with .match()
+    
+    The match's lastgroup is the first name, in order, whose pattern occurs
+    anywhere in the text - the same answer as searching each pattern in turn.
+    """
+    branches = [f"(?P<{name}>(?s:.*?)(?:{pattern}))" for name, pattern in named_patterns]
+    return re.compile("|".join(branches), re.IGNORECASE)
+
+
+def _time_buckets(rules: List[Dict[str, Any]]) -> Tuple[List[int], List[Tuple[int, int, int, str]], int]:
+    """Index time rules as minute-of-day intervals sorted by start
+    
+    Each rule becomes (start, duration, rule index, rule id), with the duration taken
+    modulo a day so overnight rules need no special case; a rule that runs past
+    midnight gets a second entry starting a day earlier so a bisect from early
+    morning still reaches it. Returns the sorted starts, the intervals, and the
+    longest duration.
+    """
+    buckets = []
+    for order, rule in enumerate(rules):
+        start = rule["start"].hour * 60 + rule["start"].minute
+        end = rule["end"].hour * 60 + rule["end"].minute
+        duration = (end - start) % _DAY_MINUTES
+        buckets.append((start, duration, order, rule["id"]))
+        if start + duration > _DAY_MINUTES:
+            buckets.append((start - _DAY_MINUTES, duration, order, rule["id"]))
+    buckets.sort()
+    max_span = max((duration for _, duration, _, _ in buckets), default=0)
+    return [b[0] for b in buckets], buckets, max_span
 
 
 class SuggestionType(Enum):
@@ -37,7 +107,7 @@ class SuggestionPriority(Enum):
     URGENT = 4
 
 
-@dataclass
+@dataclass(slots=True)
 class Suggestion:
     """A proactive suggestion"""
     id: str
@@ -55,7 +125,7 @@ class Suggestion:
     times_rejected: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class SuggestionFeedback:
     """Feedback on a suggestion"""
     suggestion_id: str
@@ -162,29 +232,89 @@ class SuggestionEngine:
         }
     }
     
+    # Follow-up suggestions based on common patterns, keyed by (tool, action)
+    FOLLOW_UPS: Dict[Tuple[str, str], Dict[str, Any]] = {
+        ("windows", "search_files"): {
+            "message": "Found some files. Want me to open one or create a backup?",
+            "priority": SuggestionPriority.LOW
+        },
+        ("windows", "execute_script"): {
+            "message": "Script executed. Want me to save it for later or run it again?",
+            "priority": SuggestionPriority.LOW
+        },
+        ("system_info", "get_hardware"): {
+            "message": "Got your hardware info. Want me to check for driver updates or monitor temps?",
+            "priority": SuggestionPriority.LOW
+        },
+        ("web_search", "search"): {
+            "message": "Found some results. Want me to fetch more details from any of these?",
+            "priority": SuggestionPriority.LOW
+        },
+        ("memory", "store"): {
+            "message": "Saved that. Want me to recall related memories?",
+            "priority": SuggestionPriority.LOW
+        }
+    }
+    
+    # Keywords that identify each error type, checked in this order
+    ERROR_KEYWORDS = {
+        "permission": ["permission", "access denied", "admin"],
+        "not_found": ["not found", "missing", "no such"],
+        "network": ["network", "connection", "unreachable"],
+        "timeout": ["timeout", "timed out"]
+    }
+    
+    # Cooldown entries kept before the oldest are evicted
+    _MAX_COOLDOWNS = 1024
+    
+    # Feedback log lines written before the next flush rewrites the full history
+    _LOG_COMPACT_AT = 64
+    
+    # Patterns compiled once at class load
+    _CONTEXT_UNION, _CONTEXT_GROUPS = _match_all_union([(p["id"], p["pattern"]) for p in CONTEXT_PATTERNS])
+    _TIME_STARTS, _TIME_BUCKETS, _TIME_MAX_SPAN = _time_buckets(TIME_RULES)
+    _ERROR_UNION = _first_match_union(
+        [(error_type, "|".join(map(re.escape, words))) for error_type, words in ERROR_KEYWORDS.items()]
+    )
+    _ERROR_IDS = {error_type: f"error_{error_type}" for error_type in ERROR_KEYWORDS}
+    
     def __init__(self, suggestions_file: str = "suggestion_history.json"):
         self.suggestions_file = suggestions_file
         self._lock = asyncio.Lock()
+        self._save_lock = asyncio.Lock()  # Orders file writes without holding _lock across I/O
         self._suggestions: Dict[str, Suggestion] = {}
-        self._feedback_history: List[SuggestionFeedback] = []
-        self._suggestion_cooldowns: Dict[str, datetime] = {}
+        self._feedback_history: deque = deque(maxlen=100)  # Oldest feedback falls off automatically
+        self._suggestion_cooldowns: OrderedDict[str, datetime] = OrderedDict()  # Oldest first, capped
         self._min_interval = timedelta(minutes=5)  # Min time between any suggestions
         self._last_suggestion_time: Optional[datetime] = None
         self._context_callback: Optional[Callable] = None
         self._enabled = True
+        self._dirty = False  # History changed since the last save
+        self._save_debounce = 2.0  # Seconds to gather feedback before writing
+        self._flush_task: Optional[asyncio.Task] = None
+        self._log_file = f"{suggestions_file}.log"  # Feedback appended since the last snapshot
+        self._pending_log: List[Dict[str, Any]] = []  # Log lines not yet written
+        self._log_lines = 0  # Lines in the log file
+        self._feedback_seq = 0  # Sequence number of the latest logged show or feedback
     
     async def initialize(self) -> bool:
         """Initialize suggestion engine"""
         async with self._lock:
+            # Read the history files on a worker thread while the catalog is built,
+            # then apply them - stats can only be restored onto built suggestions
+            pending = asyncio.get_running_loop().run_in_executor(None, self._read_history_files)
+            self._build_suggestions()
             try:
-                await self._load_history()
-                self._build_suggestions()
-                logging.info(f"Suggestion engine initialized with {len(self._suggestions)} suggestions")
-                return True
-            except Exception as e:
+                content, log = await pending
+            except OSError as e:
                 logging.warning(f"Could not load suggestion history: {e}")
-                self._build_suggestions()
-                return True
+                content, log = None, None
+            if content is not None:
+                self._apply_history(content)
+            if log is not None:
+                self._replay_feedback_log(log)
+            logging.info(f"Suggestion engine initialized with {len(self._suggestions)} suggestions")
+            return True
     
     def _build_suggestions(self):
         """Build suggestion catalog from rules"""
@@ -224,6 +354,17 @@ class SuggestionEngine:
                 action_args=config.get("action_args", {}),
                 cooldown_minutes=15
             )
+        
+        # Follow-up suggestions
+        for (tool, action), config in self.FOLLOW_UPS.items():
+            sugg_id = f"followup_{tool}_{action}"
+            self._suggestions[sugg_id] = Suggestion(
+                id=sugg_id,
+                type=SuggestionType.FOLLOW_UP,
+                priority=config["priority"],
+                message=config["message"],
+                cooldown_minutes=10
+            )
 
     async def get_suggestion(
         self,
@@ -245,112 +386,125 @@ class SuggestionEngine:
         if not self._enabled and not force:
             return None
         
+        # One clock read serves every cooldown check and timestamp below
+        now = datetime.now()
+        
+        # Global cooldown fast path - most turns end here without touching the lock
+        last_time = self._last_suggestion_time
+        if not force and last_time and now - last_time < self._min_interval:
+            return None
+        
         async with self._lock:
-            # Check global cooldown
+            # Re-check - another caller may have shown one while we waited
             if not force and self._last_suggestion_time:
-                if datetime.now() - self._last_suggestion_time < self._min_interval:
+                if now - self._last_suggestion_time < self._min_interval:
                     return None
             
-            candidates: List[Tuple[Suggestion, float]] = []
+            # (priority, score, -arrival, suggestion) - plain tuple order ranks them,
+            # and the negated arrival index keeps earlier candidates first on ties
+            candidates: List[Tuple[int, float, int, Suggestion]] = []
             
             # Check error-based suggestions first (highest priority)
             if recent_error:
                 error_suggestion = self._get_error_suggestion(recent_error)
-                if error_suggestion and self._can_show(error_suggestion):
-                    candidates.append((error_suggestion, 10.0))
+                if error_suggestion and self._can_show(error_suggestion, now):
+                    candidates.append((error_suggestion.priority.value, 10.0, -len(candidates), error_suggestion))
             
             # Check time-based suggestions
-            time_suggestion = self._get_time_suggestion()
-            if time_suggestion and self._can_show(time_suggestion):
-                candidates.append((time_suggestion, 5.0))
+            time_suggestion = self._get_time_suggestion(now.time())
+            if time_suggestion and self._can_show(time_suggestion, now):
+                candidates.append((time_suggestion.priority.value, 5.0, -len(candidates), time_suggestion))
             
             # Check context-based suggestions
             if context:
-                context_suggestions = self._get_context_suggestions(context)
-                for sugg in context_suggestions:
-                    if self._can_show(sugg):
-                        # Score based on acceptance rate
-                        score = self._calculate_score(sugg)
-                        candidates.append((sugg, score))
+                for sugg in self._get_context_suggestions(context, now):
+                    # Score based on acceptance rate
+                    score = self._calculate_score(sugg)
+                    candidates.append((sugg.priority.value, score, -len(candidates), sugg))
             
             if not candidates:
                 return None
             
-            # Sort by score and priority
-            candidates.sort(key=lambda x: (x[0].priority.value, x[1]), reverse=True)
+            # Only the top three by priority and score are ever picked from
+            top = heapq.nlargest(3, candidates)
             
             # Pick the best one (with some randomness for variety)
-            if len(candidates) > 1 and random.random() < 0.3:
-                selected = random.choice(candidates[:3])[0]
+            if len(top) > 1 and random.random() < 0.3:
+                selected = random.choice(top)[3]
             else:
-                selected = candidates[0][0]
+                selected = top[0][3]
             
             # Update tracking
-            selected.times_shown += 1
-            selected.last_shown = datetime.now().isoformat()
-            self._suggestion_cooldowns[selected.id] = datetime.now()
-            self._last_suggestion_time = datetime.now()
+            self._mark_shown(selected, now)
+            self._last_suggestion_time = now
             
             return selected
     
     def _get_error_suggestion(self, error_message: str) -> Optional[Suggestion]:
         """Get suggestion based on error type"""
-        error_lower = error_message.lower()
-        
-        if any(w in error_lower for w in ["permission", "access denied", "admin"]):
-            return self._suggestions.get("error_permission")
-        elif any(w in error_lower for w in ["not found", "missing", "no such"]):
-            return self._suggestions.get("error_not_found")
-        elif any(w in error_lower for w in ["network", "connection", "unreachable"]):
-            return self._suggestions.get("error_network")
-        elif any(w in error_lower for w in ["timeout", "timed out"]):
-            return self._suggestions.get("error_timeout")
-        
-        return None
+        matched = self._ERROR_UNION.match(error_message)
+        return self._suggestions.get(self._ERROR_IDS[matched.lastgroup]) if matched else None
     
-    def _get_time_suggestion(self) -> Optional[Suggestion]:
-        """Get suggestion based on current time"""
-        now = datetime.now().time()
+    def _get_time_suggestion(self, now: time) -> Optional[Suggestion]:
+        """Get suggestion based on the given time of day"""
+        minute = now.hour * 60 + now.minute
         
-        for rule in self.TIME_RULES:
-            start = rule["start"]
-            end = rule["end"]
-            
-            # Handle overnight ranges (e.g., 23:00 to 03:00)
-            if start > end:
-                if now >= start or now <= end:
-                    return self._suggestions.get(rule["id"])
-            else:
-                if start <= now <= end:
-                    return self._suggestions.get(rule["id"])
+        # Walk back from the last interval starting at or before now; anything
+        # starting a full max span earlier has already ended
+        best: Optional[Tuple[int, str]] = None
+        i = bisect_right(self._TIME_STARTS, minute)
+        while i > 0:
+            i -= 1
+            start, duration, order, rule_id = self._TIME_BUCKETS[i]
+            if start + self._TIME_MAX_SPAN <= minute:
+                break
+            if (minute - start) % _DAY_MINUTES < duration and (best is None or order < best[0]):
+                best = (order, rule_id)
         
-        return None
+        # Earliest matching rule wins, as with a scan of TIME_RULES
+        return self._suggestions.get(best[1]) if best else None
     
-    def _get_context_suggestions(self, context: Dict[str, Any]) -> List[Suggestion]:
-        """Get suggestions based on context"""
+    def _get_context_suggestions(self, context: Dict[str, Any], now: datetime) -> List[Suggestion]:
+        """Get showable suggestions based on context, each at most once"""
         suggestions = []
+        seen: Set[str] = set()
         
         # Get topics from context
         topics = context.get("topics", [])
         recent_text = context.get("recent_text", "")
-        combined = " ".join(topics) + " " + recent_text
+        # Match the text as-is when there are no topics; otherwise build it in one go
+        combined = f"{' '.join(topics)} {recent_text}" if topics else recent_text
         
-        for pattern_config in self.CONTEXT_PATTERNS:
-            pattern = pattern_config["pattern"]
-            if re.search(pattern, combined, re.IGNORECASE):
-                sugg = self._suggestions.get(pattern_config["id"])
-                if sugg:
+        # One pass reports every pattern that occurs in the text, in table order
+        matched = self._CONTEXT_UNION.match(combined)
+        for group, text in matched.groupdict().items():
+            if text is not None:
+                sugg_id = self._CONTEXT_GROUPS[group]
+                if sugg_id in seen:
+                    continue
+                seen.add(sugg_id)
+                sugg = self._suggestions.get(sugg_id)
+                if sugg and self._can_show(sugg, now):
                     suggestions.append(sugg)
         
         return suggestions
     
-    def _can_show(self, suggestion: Suggestion) -> bool:
-        """Check if suggestion can be shown (not on cooldown)"""
-        if suggestion.id in self._suggestion_cooldowns:
-            last_shown = self._suggestion_cooldowns[suggestion.id]
+    def _start_cooldown(self, suggestion_id: str, now: datetime):
+        """Record when a suggestion was shown, evicting the oldest entries past the cap"""
+        self._suggestion_cooldowns[suggestion_id] = now
+        self._suggestion_cooldowns.move_to_end(suggestion_id)
+        while len(self._suggestion_cooldowns) > self._MAX_COOLDOWNS:
+            self._suggestion_cooldowns.popitem(last=False)
+    
+    def _can_show(self, suggestion: Suggestion, now: datetime) -> bool:
+        """Check if suggestion can be shown (not on cooldown) at the given time"""
+        last_shown = self._suggestion_cooldowns.get(suggestion.id)
+        if last_shown is not None:
             cooldown = timedelta(minutes=suggestion.cooldown_minutes)
-            if datetime.now() - last_shown < cooldown:
+            if now - last_shown < cooldown:
                 return False
+            # Expired - drop it so the table only holds live cooldowns
+            del self._suggestion_cooldowns[suggestion.id]
         
         # Don't show suggestions that are consistently rejected
         if suggestion.times_shown > 5:
@@ -379,25 +533,56 @@ class SuggestionEngine:
         """Record user feedback on a suggestion"""
         async with self._lock:
             if suggestion_id in self._suggestions:
-                sugg = self._suggestions[suggestion_id]
-                if accepted:
-                    sugg.times_accepted += 1
-                else:
-                    sugg.times_rejected += 1
-                
-                self._feedback_history.append(SuggestionFeedback(
-                    suggestion_id=suggestion_id,
-                    accepted=accepted,
-                    timestamp=datetime.now().isoformat(),
-                    context=context
-                ))
+                timestamp = datetime.now().isoformat()
+                self._apply_feedback(suggestion_id, accepted, timestamp, context)
                 
-                # Keep only last 100 feedback entries
-                if len(self._feedback_history) > 100:
-                    self._feedback_history = self._feedback_history[-100:]
+                # Queue one log line - the flush appends it instead of rewriting the history
+                self._feedback_seq += 1
+                self._pending_log.append({
+                    "seq": self._feedback_seq,
+                    "sid": suggestion_id,
+                    "accepted": accepted,
+                    "ts": timestamp,
+                    "context": context
+                })
                 
-                await self._save_history()
+                self._mark_dirty()
                 logging.info(f"Recorded feedback for {suggestion_id}: {'accepted' if accepted else 'rejected'}")
+    
+    def _mark_shown(self, sugg: Suggestion, now: datetime):
+        """Count a suggestion as shown and log it - call with _lock held
+        
+        Logged like feedback, so a replay after a crash never leaves more
+        accepts than shows behind.
+        """
+        timestamp = now.isoformat()
+        sugg.times_shown += 1
+        sugg.last_shown = timestamp
+        self._start_cooldown(sugg.id, now)
+        
+        self._feedback_seq += 1
+        self._pending_log.append({
+            "seq": self._feedback_seq,
+            "sid": sugg.id,
+            "shown": True,
+            "ts": timestamp
+        })
+        self._mark_dirty()
+    
+    def _apply_feedback(self, suggestion_id: str, accepted: bool, timestamp: str, context: Optional[str]):
+        """Count one piece of feedback against a known suggestion and keep it in history"""
+        sugg = self._suggestions[suggestion_id]
+        if accepted:
+            sugg.times_accepted += 1
+        else:
+            sugg.times_rejected += 1
+        
+        self._feedback_history.append(SuggestionFeedback(
+            suggestion_id=suggestion_id,
+            accepted=accepted,
+            timestamp=timestamp,
+            context=context
+        ))
 
     async def add_custom_suggestion(
         self,
@@ -433,51 +618,17 @@ class SuggestionEngine:
         last_result: Any
     ) -> Optional[Suggestion]:
         """Get a follow-up suggestion based on last action"""
+        now = datetime.now()
+        
+        # Most actions have no follow-up - answer those without the lock
+        if (last_tool, last_action) not in self.FOLLOW_UPS:
+            return None
+        
         async with self._lock:
-            # Follow-up suggestions based on common patterns
-            follow_ups = {
-                ("windows", "search_files"): {
-                    "message": "Found some files. Want me to open one or create a backup?",
-                    "priority": SuggestionPriority.LOW
-                },
-                ("windows", "execute_script"): {
-                    "message": "Script executed. Want me to save it for later or run it again?",
-                    "priority": SuggestionPriority.LOW
-                },
-                ("system_info", "get_hardware"): {
-                    "message": "Got your hardware info. Want me to check for driver updates or monitor temps?",
-                    "priority": SuggestionPriority.LOW
-                },
-                ("web_search", "search"): {
-                    "message": "Found some results. Want me to fetch more details from any of these?",
-                    "priority": SuggestionPriority.LOW
-                },
-                ("memory", "store"): {
-                    "message": "Saved that. Want me to recall related memories?",
-                    "priority": SuggestionPriority.LOW
-                }
-            }
-            
-            key = (last_tool, last_action)
-            if key in follow_ups:
-                config = follow_ups[key]
-                sugg_id = f"followup_{last_tool}_{last_action}"
-                
-                if sugg_id not in self._suggestions:
-                    self._suggestions[sugg_id] = Suggestion(
-                        id=sugg_id,
-                        type=SuggestionType.FOLLOW_UP,
-                        priority=config["priority"],
-                        message=config["message"],
-                        cooldown_minutes=10
-                    )
-                
-                sugg = self._suggestions[sugg_id]
-                if self._can_show(sugg):
-                    sugg.times_shown += 1
-                    sugg.last_shown = datetime.now().isoformat()
-                    self._suggestion_cooldowns[sugg_id] = datetime.now()
-                    return sugg
+            sugg = self._suggestions.get(f"followup_{last_tool}_{last_action}")
+            if sugg and self._can_show(sugg, now):
+                self._mark_shown(sugg, now)
+                return sugg
             
             return None
     
@@ -513,66 +664,195 @@ class SuggestionEngine:
                 )[:5]
             }
     
-    async def _save_history(self):
-        """Save suggestion history to file"""
+    def _mark_dirty(self):
+        """Schedule a debounced save - bursts of feedback become one write"""
+        self._dirty = True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._periodic_flush())
+    
+    async def _periodic_flush(self):
+        """Flush history at most once per debounce interval while there are changes"""
+        while self._dirty:
+            await asyncio.sleep(self._save_debounce)
+            async with self._save_lock:
+                async with self._lock:
+                    if not self._dirty:
+                        continue
+                    data, lines = self._prepare_flush(compact=False)
+                await self._write_flush(data, lines)
+    
+    def _prepare_flush(self, compact: bool) -> Tuple[Optional[Dict[str, Any]], bytes]:
+        """Decide what the next write is - call with _lock held
+        
+        Returns a full snapshot to write (after which the log is dropped), or
+        None and the pending feedback lines to append to the log.
+        """
+        self._dirty = False
+        pending = self._pending_log
+        self._pending_log = []
+        if compact or self._log_lines + len(pending) >= self._LOG_COMPACT_AT:
+            self._log_lines = 0
+            return self._snapshot_history(), b""
+        self._log_lines += len(pending)
+        return None, b"".join(map(_dumps_line, pending))
+    
+    async def _write_flush(self, data: Optional[Dict[str, Any]], lines: bytes):
+        """Write what _prepare_flush decided - call with _save_lock held"""
+        if data is not None:
+            # The snapshot carries feedback_seq, so a log left behind by a crash
+            # before the unlink is skipped on the next load
+            if await self._save_history(data):
+                try:
+                    await asyncio.to_thread(os.remove, self._log_file)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logging.error(f"Failed to remove suggestion feedback log: {e}")
+        elif lines:
+            try:
+                async with aiofiles.open(self._log_file, 'ab') as f:
+                    await f.write(lines)
+            except Exception as e:
+                logging.error(f"Failed to append suggestion feedback log: {e}")
+    
+    def _snapshot_history(self) -> Dict[str, Any]:
+        """Copy the persisted fields into a plain dict - call with _lock held"""
+        return {
+            "last_updated": datetime.now().isoformat(),
+            "feedback_seq": self._feedback_seq,
+            "suggestions": {
+                sid: {
+                    "times_shown": s.times_shown,
+                    "times_accepted": s.times_accepted,
+                    "times_rejected": s.times_rejected,
+                    "last_shown": s.last_shown
+                }
+                for sid, s in self._suggestions.items()
+            },
+            "feedback": [
+                {
+                    "suggestion_id": f.suggestion_id,
+                    "accepted": f.accepted,
+                    "timestamp": f.timestamp,
+                    "context": f.context
+                }
+                for f in list(self._feedback_history)[-50:]
+            ]
+        }
+    
+    async def _save_history(self, data: Dict[str, Any]) -> bool:
+        """Atomically save a history snapshot - readers see the old file or the new one, never a partial write"""
+        tmp_file = f"{self.suggestions_file}.tmp"
         try:
-            data = {
-                "last_updated": datetime.now().isoformat(),
-                "suggestions": {
-                    sid: {
-                        "times_shown": s.times_shown,
-                        "times_accepted": s.times_accepted,
-                        "times_rejected": s.times_rejected,
-                        "last_shown": s.last_shown
-                    }
-                    for sid, s in self._suggestions.items()
-                },
-                "feedback": [
-                    {
-                        "suggestion_id": f.suggestion_id,
-                        "accepted": f.accepted,
-                        "timestamp": f.timestamp,
-                        "context": f.context
-                    }
-                    for f in self._feedback_history[-50:]
-                ]
-            }
-            async with aiofiles.open(self.suggestions_file, 'w') as f:
-                await f.write(json.dumps(data, indent=2))
+            if ORJSON_AVAILABLE:
+                payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(data, indent=2).encode("utf-8")
+            async with aiofiles.open(tmp_file, 'wb') as f:
+                await f.write(payload)
+            await asyncio.to_thread(os.replace, tmp_file, self.suggestions_file)
+            return True
         except Exception as e:
             logging.error(f"Failed to save suggestion history: {e}")
+            return False
     
-    async def _load_history(self):
-        """Load suggestion history from file"""
+    def _read_history_files(self) -> Tuple[Optional[bytes], Optional[bytes]]:
+        """Read the raw history snapshot and feedback log, None for each missing one - runs on a worker thread"""
+        contents: List[Optional[bytes]] = []
+        for path in (self.suggestions_file, self._log_file):
+            try:
+                with open(path, 'rb') as f:
+                    contents.append(f.read())
+            except FileNotFoundError:
+                contents.append(None)
+        return contents[0], contents[1]
+    
+    def _apply_history(self, content: bytes):
+        """Restore stats and feedback from history file contents - call after _build_suggestions"""
         try:
-            async with aiofiles.open(self.suggestions_file, 'r') as f:
-                content = await f.read()
-                data = json.loads(content)
-            
-            # Restore suggestion stats
-            for sid, stats in data.get("suggestions", {}).items():
-                if sid in self._suggestions:
-                    self._suggestions[sid].times_shown = stats.get("times_shown", 0)
-                    self._suggestions[sid].times_accepted = stats.get("times_accepted", 0)
-                    self._suggestions[sid].times_rejected = stats.get("times_rejected", 0)
-                    self._suggestions[sid].last_shown = stats.get("last_shown")
-            
-            # Restore feedback history
-            for f_data in data.get("feedback", []):
-                self._feedback_history.append(SuggestionFeedback(
-                    suggestion_id=f_data["suggestion_id"],
-                    accepted=f_data["accepted"],
-                    timestamp=f_data["timestamp"],
-                    context=f_data.get("context")
-                ))
-                
-        except FileNotFoundError:
-            pass
-        except Exception as e:
+            data = orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
+        except ValueError as e:
+            # Saves are atomic, so this is a hand-edited or foreign file rather than a torn write
             logging.warning(f"Error loading suggestion history: {e}")
+            return
+        if not isinstance(data, dict):
+            logging.warning("Error loading suggestion history: expected a JSON object")
+            return
+        
+        feedback_seq = data.get("feedback_seq", 0)
+        self._feedback_seq = feedback_seq if isinstance(feedback_seq, int) else 0
+        
+        # Restore suggestion stats - entries of the wrong shape are skipped
+        suggestions = data.get("suggestions")
+        if isinstance(suggestions, dict):
+            for sid, stats in suggestions.items():
+                suggestion = self._suggestions.get(sid)
+                if suggestion is None or not isinstance(stats, dict):
+                    continue
+                suggestion.times_shown = stats.get("times_shown", 0)
+                suggestion.times_accepted = stats.get("times_accepted", 0)
+                suggestion.times_rejected = stats.get("times_rejected", 0)
+                suggestion.last_shown = stats.get("last_shown")
+        
+        # Restore feedback history - only the entries the deque will keep
+        feedback = data.get("feedback")
+        if isinstance(feedback, list):
+            for f_data in feedback[-self._feedback_history.maxlen:]:
+                if not isinstance(f_data, dict):
+                    continue
+                try:
+                    self._feedback_history.append(SuggestionFeedback(
+                        suggestion_id=f_data["suggestion_id"],
+                        accepted=f_data["accepted"],
+                        timestamp=f_data["timestamp"],
+                        context=f_data.get("context")
+                    ))
+                except KeyError as e:
+                    logging.warning(f"Skipping suggestion feedback entry missing {e}")
+    
+    def _replay_feedback_log(self, log: bytes):
+        """Apply shows and feedback logged after the snapshot - call after _apply_history"""
+        for line in log.splitlines():
+            try:
+                entry = orjson.loads(line) if ORJSON_AVAILABLE else json.loads(line)
+            except ValueError:
+                continue  # Torn final line from a crash mid-append
+            
+            self._log_lines += 1
+            # Skip hand-edited or older-format lines rather than failing startup
+            if not isinstance(entry, dict):
+                continue
+            try:
+                seq, sid, ts = entry["seq"], entry["sid"], entry["ts"]
+                # Already counted in the snapshot
+                if seq <= self._feedback_seq:
+                    continue
+                known = sid in self._suggestions
+                shown = entry.get("shown", False)
+                accepted = None if shown else entry["accepted"]
+            except (KeyError, TypeError):
+                continue
+            self._feedback_seq = seq
+            if not known:
+                continue
+            if shown:
+                sugg = self._suggestions[sid]
+                sugg.times_shown += 1
+                sugg.last_shown = ts
+            else:
+                self._apply_feedback(sid, accepted, ts, entry.get("context"))
     
     async def cleanup(self):
         """Save history before shutdown"""
-        async with self._lock:
-            await self._save_history()
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        
+        async with self._save_lock:
+            async with self._lock:
+                data, lines = self._prepare_flush(compact=True)
+            await self._write_flush(data, lines)
             logging.info("Suggestion history saved")
@@ -5,17 +5,81 @@ Enables multi-step task execution from single requests
 Rules followed:
 - All imports MUST be used
 - Async with asyncio.Lock() for thread safety
-- aiofiles for file I/O
+- File I/O batched onto a worker thread (asyncio.to_thread)
 """
 import asyncio
 import logging
+import os
 import re
-from typing import Dict, Any, List, Optional, Callable, Awaitable
+import time
+from collections import Counter, deque
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Deque, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
+from pathlib import Path
 from enum import Enum
 import json
-import aiofiles
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps_compact(data: Any) -> bytes:
+    """Serialize one value to compact UTF-8 JSON"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+# save_chain flushes serialized tasks to the file in chunks of about this size
+_SAVE_CHUNK_BYTES = 64 * 1024
+
+
+def _write_chain_file(filepath: str, created: str, rows: List[Dict[str, Any]]):
+    """Stream a saved chain to disk, one task per line - runs on a worker thread
+    
+    Written to a temp file and moved into place, so a failure partway through
+    leaves the previous save intact rather than a truncated file.
+    """
+    tmp_path = f"{filepath}.tmp"
+    try:
+        _stream_chain_file(tmp_path, created, rows)
+        os.replace(tmp_path, filepath)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _stream_chain_file(filepath: str, created: str, rows: List[Dict[str, Any]]):
+    """Write the chain document header, task lines and footer"""
+    with open(filepath, 'wb') as f:
+        f.write(b'{\n  "created": ' + _dumps_compact(created) + b',\n  "tasks": [')
+        chunk = bytearray()
+        for i, row in enumerate(rows):
+            chunk += b",\n    " if i else b"\n    "
+            chunk += _dumps_compact(row)
+            if len(chunk) >= _SAVE_CHUNK_BYTES:
+                f.write(chunk)
+                chunk.clear()
+        chunk += b"\n  ]\n}\n" if rows else b"]\n}\n"
+        f.write(chunk)
+
+
+# Sentinel for attribute lookups where None is a valid value
+_MISSING = object()
+
+
+def _iso_from_ns(timestamp_ns: Optional[int]) -> Optional[str]:
+    """Format a time.time_ns() timestamp as a local ISO string"""
+    if timestamp_ns is None:
+        return None
+    return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
 
 
 class TaskStatus(Enum):
@@ -40,8 +104,18 @@ class ChainTask:
     status: TaskStatus = TaskStatus.PENDING
     result: Any = None
     error: Optional[str] = None
-    started_at: Optional[str] = None
-    completed_at: Optional[str] = None
+    started_at_ns: Optional[int] = None    # time.time_ns() when the task started
+    completed_at_ns: Optional[int] = None  # time.time_ns() when the task finished
+    
+    @property
+    def started_at(self) -> Optional[str]:
+        """ISO start time, formatted only when asked for"""
+        return _iso_from_ns(self.started_at_ns)
+    
+    @property
+    def completed_at(self) -> Optional[str]:
+        """ISO completion time, formatted only when asked for"""
+        return _iso_from_ns(self.completed_at_ns)
 
 
 @dataclass
@@ -72,6 +146,10 @@ class TaskChain:
         r';\s*',  # Semicolon as separator
     ]
     
+    # Patterns compiled once at class load into one alternation - detection and
+    # splitting each take a single pass over the input
+    _CHAIN_RE = re.compile("|".join(f"(?:{p})" for p in CHAIN_PATTERNS), re.IGNORECASE)
+    
     def __init__(self, tool_executor: Callable[[str, Dict[str, Any]], Awaitable[Any]]):
         """
         Initialize TaskChain
@@ -82,16 +160,14 @@ class TaskChain:
         self.tool_executor = tool_executor
         self._lock = asyncio.Lock()
         self._tasks: List[ChainTask] = []
+        self._task_index: Dict[str, ChainTask] = {}  # Task ID -> task, kept in step with _tasks
+        self._next_id = 0  # Counter for task IDs, never reused within this chain manager
         self._execution_log: List[Dict[str, Any]] = []
         self._rollback_actions: List[Callable[[], Awaitable[None]]] = []
     
     def detect_chain(self, user_input: str) -> bool:
         """Detect if user input contains a chained request"""
-        input_lower = user_input.lower()
-        for pattern in self.CHAIN_PATTERNS:
-            if re.search(pattern, input_lower):
-                return True
-        return False
+        return self._CHAIN_RE.search(user_input) is not None
     
     def parse_chain_request(self, user_input: str) -> List[str]:
         """
@@ -99,17 +175,8 @@ class TaskChain:
         
         Returns list of individual request strings
         """
-        # Split by chain patterns
-        parts = [user_input]
-        
-        for pattern in self.CHAIN_PATTERNS:
-            new_parts = []
-            for part in parts:
-                split = re.split(pattern, part, flags=re.IGNORECASE)
-                new_parts.extend([p.strip() for p in split if p.strip()])
-            parts = new_parts
-        
-        return parts
+        # Split on every chain pattern at once; the leftmost (then first listed) separator wins
+        return [p.strip() for p in self._CHAIN_RE.split(user_input) if p.strip()]
 
     async def add_task(
         self,
@@ -134,7 +201,12 @@ class TaskChain:
             Task ID
         """
         async with self._lock:
-            task_id = f"task_{len(self._tasks)}_{datetime.now().strftime('%H%M%S%f')}"
+            # Counter IDs - skip any taken by a loaded chain
+            task_id = f"task_{self._next_id}"
+            while task_id in self._task_index:
+                self._next_id += 1
+                task_id = f"task_{self._next_id}"
+            self._next_id += 1
             
             task = ChainTask(
                 id=task_id,
@@ -146,6 +218,7 @@ class TaskChain:
             )
             
             self._tasks.append(task)
+            self._task_index[task_id] = task
             logging.info(f"Added task to chain: {task_id} - {tool_name}.{action}")
             
             return task_id
@@ -154,116 +227,76 @@ class TaskChain:
         """
         Execute all tasks in the chain
         
+        Each task starts as soon as its dependency has finished, so independent
+        tasks run concurrently and a slow task only holds up its own dependents.
+        
         Args:
-            stop_on_failure: If True, stop chain on first failure
+            stop_on_failure: If True, a failure cancels tasks still running and skips the rest
         
         Returns:
             TaskChainResult with execution summary
         """
         async with self._lock:
             start_time = datetime.now()
-            completed = 0
-            failed = 0
-            skipped = 0
-            results = []
+            start_ns = time.perf_counter_ns()
+            entries: Dict[str, Dict[str, Any]] = {}  # Task ID -> result entry, in finish order
+            first_failure: Optional[ChainTask] = None
+            position = {task.id: i for i, task in enumerate(self._tasks)}
+            ready, waiting = self._schedule()
+            running: Dict[asyncio.Task, ChainTask] = {}
+            stopped = False
             
-            for task in self._tasks:
-                # Check if dependency failed
-                if task.depends_on:
-                    dep_task = self._get_task_by_id(task.depends_on)
-                    if dep_task and dep_task.status == TaskStatus.FAILED:
-                        task.status = TaskStatus.SKIPPED
-                        skipped += 1
-                        results.append({
-                            "task_id": task.id,
-                            "status": "skipped",
-                            "reason": f"Dependency {task.depends_on} failed"
-                        })
-                        continue
-                    
-                    # Apply result mapping from dependency
-                    if dep_task and dep_task.result and task.result_mapping:
-                        task.args = self._apply_result_mapping(
-                            task.args, 
-                            dep_task.result, 
-                            task.result_mapping
-                        )
-                
-                # Execute task
-                task.status = TaskStatus.RUNNING
-                task.started_at = datetime.now().isoformat()
-                
-                try:
-                    # Build full args with action
-                    full_args = {"action": task.action, **task.args}
-                    
-                    # Execute via tool executor
-                    result = await self.tool_executor(task.tool_name, full_args)
-                    
-                    task.completed_at = datetime.now().isoformat()
-                    
-                    # Check result status
-                    if hasattr(result, 'status'):
-                        if result.status.value == "success":
-                            task.status = TaskStatus.COMPLETED
-                            task.result = result.data if hasattr(result, 'data') else result
-                            completed += 1
-                            results.append({
-                                "task_id": task.id,
-                                "status": "completed",
-                                "result": str(task.result)[:200]
-                            })
-                        else:
-                            task.status = TaskStatus.FAILED
-                            task.error = result.error if hasattr(result, 'error') else str(result)
-                            failed += 1
-                            results.append({
-                                "task_id": task.id,
-                                "status": "failed",
-                                "error": task.error
-                            })
-                            
-                            if stop_on_failure:
-                                break
-                    else:
-                        # Assume success if no status
-                        task.status = TaskStatus.COMPLETED
-                        task.result = result
-                        completed += 1
-                        results.append({
-                            "task_id": task.id,
-                            "status": "completed",
-                            "result": str(result)[:200]
-                        })
-                        
-                except Exception as e:
-                    task.completed_at = datetime.now().isoformat()
-                    task.status = TaskStatus.FAILED
-                    task.error = str(e)
-                    failed += 1
-                    results.append({
-                        "task_id": task.id,
-                        "status": "failed",
-                        "error": str(e)
-                    })
-                    logging.error(f"Task {task.id} failed: {e}")
-                    
-                    if stop_on_failure:
+            try:
+                while (ready or running) and not stopped:
+                    while ready:
+                        task = ready.popleft()
+                        running[asyncio.create_task(self._run_task(task))] = task
+                    if not running:
                         break
+                    
+                    done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    for future in sorted(done, key=lambda f: position[running[f].id]):
+                        task = running.pop(future)
+                        entries[task.id] = future.result()
+                        if task.status == TaskStatus.FAILED and first_failure is None:
+                            first_failure = task
+                        # Nothing new starts and in-flight tasks are cancelled below
+                        if stop_on_failure and task.status == TaskStatus.FAILED:
+                            stopped = True
+                        # Dependents become ready whatever the outcome - skipping is their call
+                        ready.extend(waiting.pop(task.id, ()))
+            finally:
+                for future in running:
+                    future.cancel()
+                if running:
+                    # A task that finished anyway (executor swallowed the cancel) keeps its result
+                    outcomes = await asyncio.gather(*running, return_exceptions=True)
+                    for task, outcome in zip(running.values(), outcomes):
+                        if isinstance(outcome, dict):
+                            entries[task.id] = outcome
             
-            # Mark remaining tasks as skipped
+            # Mark cancelled and unstarted tasks as skipped
             for task in self._tasks:
-                if task.status == TaskStatus.PENDING:
+                if task.id not in entries:
+                    cancelled = task.status == TaskStatus.RUNNING
                     task.status = TaskStatus.SKIPPED
-                    skipped += 1
-                    results.append({
+                    if cancelled:
+                        task.completed_at_ns = time.time_ns()
+                    entries[task.id] = {
                         "task_id": task.id,
                         "status": "skipped",
-                        "reason": "Chain stopped before this task"
-                    })
+                        "reason": "Cancelled after a task failed" if cancelled else "Chain stopped before this task"
+                    }
+            
+            # Report in chain order, whatever order the tasks finished in
+            results = [entries[task.id] for task in self._tasks]
+            
+            counts = Counter(r["status"] for r in results)
+            completed = counts["completed"]
+            failed = counts["failed"]
+            skipped = counts["skipped"]
             
-            end_time = datetime.now()
-            total_time = (end_time - start_time).total_seconds() * 1000
+            total_time = (time.perf_counter_ns() - start_ns) / 1e6
             
             # Log execution
             self._execution_log.append({
@@ -281,16 +314,114 @@ class TaskChain:
                 tasks_failed=failed,
                 tasks_skipped=skipped,
                 results=results,
-                error=self._tasks[-1].error if failed > 0 and self._tasks else None,
+                error=first_failure.error if first_failure else None,
                 total_time_ms=total_time
             )
     
+    def _schedule(self) -> Tuple[Deque[ChainTask], Dict[str, List[ChainTask]]]:
+        """Split tasks into those ready to start and those waiting on each task ID
+        
+        Dependencies on unknown IDs are ignored, as before. If some tasks can never
+        become ready (a dependency cycle, only possible through load_chain), every
+        task instead waits on the one before it and the chain runs in order.
+        """
+        ready: Deque[ChainTask] = deque()
+        waiting: Dict[str, List[ChainTask]] = {}
+        for task in self._tasks:
+            if task.depends_on in self._task_index:
+                waiting.setdefault(task.depends_on, []).append(task)
+            else:
+                ready.append(task)
+        
+        reachable = len(ready)
+        frontier = list(ready)
+        while frontier:
+            for child in waiting.get(frontier.pop().id, ()):
+                reachable += 1
+                frontier.append(child)
+        
+        if reachable < len(self._tasks):
+            logging.warning("Task chain has a dependency cycle, running tasks in order")
+            return deque(self._tasks[:1]), {prev.id: [task] for prev, task in zip(self._tasks, self._tasks[1:])}
+        return ready, waiting
+    
+    async def _run_task(self, task: ChainTask) -> Dict[str, Any]:
+        """Run one task through the tool executor and return its result entry"""
+        # Check if dependency failed
+        if task.depends_on:
+            dep_task = self._get_task_by_id(task.depends_on)
+            # A skipped dependency skips this task too, so failures propagate down the chain
+            if dep_task and dep_task.status in (TaskStatus.FAILED, TaskStatus.SKIPPED):
+                task.status = TaskStatus.SKIPPED
+                return {
+                    "task_id": task.id,
+                    "status": "skipped",
+                    "reason": f"Dependency {task.depends_on} {'failed' if dep_task.status == TaskStatus.FAILED else 'was skipped'}"
+                }
+            
+            # Apply result mapping from dependency
+            if dep_task and dep_task.result and task.result_mapping:
+                task.args = self._apply_result_mapping(
+                    task.args, 
+                    dep_task.result, 
+                    task.result_mapping
+                )
+        
+        # Execute task
+        task.status = TaskStatus.RUNNING
+        task.started_at_ns = time.time_ns()
+        
+        try:
+            # Build full args with action
+            full_args = {"action": task.action, **task.args}
+            
+            # Execute via tool executor
+            result = await self.tool_executor(task.tool_name, full_args)
+            
+            task.completed_at_ns = time.time_ns()
+            
+            # Check result status
+            if hasattr(result, 'status'):
+                if result.status.value == "success":
+                    task.status = TaskStatus.COMPLETED
+                    task.result = result.data if hasattr(result, 'data') else result
+                    return {
+                        "task_id": task.id,
+                        "status": "completed",
+                        "result": str(task.result)[:200]
+                    }
+                
+                task.status = TaskStatus.FAILED
+                task.error = result.error if hasattr(result, 'error') else str(result)
+                return {
+                    "task_id": task.id,
+                    "status": "failed",
+                    "error": task.error
+                }
+            
+            # Assume success if no status
+            task.status = TaskStatus.COMPLETED
+            task.result = result
+            return {
+                "task_id": task.id,
+                "status": "completed",
+                "result": str(result)[:200]
+            }
+                
+        except Exception as e:
+            task.completed_at_ns = time.time_ns()
+            task.status = TaskStatus.FAILED
+            task.error = str(e)
+            logging.error(f"Task {task.id} failed: {e}")
+            return {
+                "task_id": task.id,
+                "status": "failed",
+                "error": str(e)
+            }
+    
     def _get_task_by_id(self, task_id: str) -> Optional[ChainTask]:
         """Get task by ID"""
-        for task in self._tasks:
-            if task.id == task_id:
-                return task
-        return None
+        return self._task_index.get(task_id)
     
     def _apply_result_mapping(
         self, 
@@ -301,14 +432,20 @@ class TaskChain:
         """Apply result mapping from dependency to task args"""
         new_args = args.copy()
         
-        for result_key, arg_key in mapping.items():
-            if isinstance(result, dict) and result_key in result:
-                new_args[arg_key] = result[result_key]
-            elif hasattr(result, result_key):
-                new_args[arg_key] = getattr(result, result_key)
-            elif isinstance(result, (str, int, float, bool)):
-                # If result is simple type, use it directly
+        # Pick the path once for the result's type rather than per key
+        if isinstance(result, dict):
+            for result_key, arg_key in mapping.items():
+                if result_key in result:
+                    new_args[arg_key] = result[result_key]
+        elif isinstance(result, (str, int, float, bool)):
+            # If result is simple type, use it directly
+            for arg_key in mapping.values():
                 new_args[arg_key] = result
+        else:
+            for result_key, arg_key in mapping.items():
+                value = getattr(result, result_key, _MISSING)
+                if value is not _MISSING:
+                    new_args[arg_key] = value
         
         return new_args
     
@@ -316,69 +453,76 @@ class TaskChain:
         """Clear all tasks from the chain"""
         async with self._lock:
             self._tasks.clear()
+            self._task_index.clear()
             self._rollback_actions.clear()
     
     async def get_chain_status(self) -> Dict[str, Any]:
-        """Get current chain status"""
-        async with self._lock:
-            return {
-                "total_tasks": len(self._tasks),
-                "pending": sum(1 for t in self._tasks if t.status == TaskStatus.PENDING),
-                "running": sum(1 for t in self._tasks if t.status == TaskStatus.RUNNING),
-                "completed": sum(1 for t in self._tasks if t.status == TaskStatus.COMPLETED),
-                "failed": sum(1 for t in self._tasks if t.status == TaskStatus.FAILED),
-                "skipped": sum(1 for t in self._tasks if t.status == TaskStatus.SKIPPED),
-                "tasks": [
-                    {
-                        "id": t.id,
-                        "tool": t.tool_name,
-                        "action": t.action,
-                        "status": t.status.value,
-                        "depends_on": t.depends_on
-                    }
-                    for t in self._tasks
-                ]
-            }
+        """Get current chain status
+        
+        Reads a snapshot without the lock, so status can be polled while a chain
+        is executing instead of waiting for it to finish.
+        """
+        tasks = list(self._tasks)
+        counts = Counter(t.status for t in tasks)  # One pass for every status
+        return {
+            "total_tasks": len(tasks),
+            "pending": counts[TaskStatus.PENDING],
+            "running": counts[TaskStatus.RUNNING],
+            "completed": counts[TaskStatus.COMPLETED],
+            "failed": counts[TaskStatus.FAILED],
+            "skipped": counts[TaskStatus.SKIPPED],
+            "tasks": [
+                {
+                    "id": t.id,
+                    "tool": t.tool_name,
+                    "action": t.action,
+                    "status": t.status.value,
+                    "depends_on": t.depends_on
+                }
+                for t in tasks
+            ]
+        }
     
     async def save_chain(self, filepath: str):
         """Save chain to file for later execution"""
         async with self._lock:
-            data = {
-                "created": datetime.now().isoformat(),
-                "tasks": [
-                    {
-                        "id": t.id,
-                        "tool_name": t.tool_name,
-                        "action": t.action,
-                        "args": t.args,
-                        "depends_on": t.depends_on,
-                        "result_mapping": t.result_mapping
-                    }
-                    for t in self._tasks
-                ]
-            }
-            async with aiofiles.open(filepath, 'w') as f:
-                await f.write(json.dumps(data, indent=2))
+            rows = [
+                {
+                    "id": t.id,
+                    "tool_name": t.tool_name,
+                    "action": t.action,
+                    "args": t.args,
+                    "depends_on": t.depends_on,
+                    "result_mapping": t.result_mapping
+                }
+                for t in self._tasks
+            ]
+        
+        # Write outside the lock so disk latency never stalls add_task/execute_chain;
+        # one worker-thread hop for open + all writes + close
+        await asyncio.to_thread(_write_chain_file, filepath, datetime.now().isoformat(), rows)
     
     async def load_chain(self, filepath: str):
         """Load chain from file"""
+        # Read and parse outside the lock - it is only held to swap the task list in
+        content = await asyncio.to_thread(Path(filepath).read_bytes)
+        data = orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
+        
+        tasks = [
+            ChainTask(
+                id=task_data["id"],
+                tool_name=task_data["tool_name"],
+                action=task_data["action"],
+                args=task_data.get("args", {}),
+                depends_on=task_data.get("depends_on"),
+                result_mapping=task_data.get("result_mapping")
+            )
+            for task_data in data.get("tasks", [])
+        ]
+        
         async with self._lock:
-            async with aiofiles.open(filepath, 'r') as f:
-                content = await f.read()
-                data = json.loads(content)
-            
-            self._tasks.clear()
-            for task_data in data.get("tasks", []):
-                task = ChainTask(
-                    id=task_data["id"],
-                    tool_name=task_data["tool_name"],
-                    action=task_data["action"],
-                    args=task_data.get("args", {}),
-                    depends_on=task_data.get("depends_on"),
-                    result_mapping=task_data.get("result_mapping")
-                )
-                self._tasks.append(task)
-
+            self._tasks = tasks
+            self._task_index = {task.id: task for task in tasks}
 
 class TaskChainBuilder:
     """Helper class to build task chains fluently"""
@@ -3,8 +3,7 @@ import numpy as np
 import os
 from typing import List, Optional
 import logging
-import random
-from .persona import get_wake_responses
+from .persona import pick_wake_response
 
 # Built-in Picovoice keywords (no .ppn file needed)
 BUILTIN_KEYWORDS = [
@@ -147,8 +146,7 @@ class WakeWordDetector:
                 if keyword_index >= 0:
                     detected_keyword = self.keywords[keyword_index]
                     self.is_listening = True
-                    wake_responses = get_wake_responses()
-                    wake_response = random.choice(wake_responses)
+                    wake_response = pick_wake_response()
                     logging.info(f"Wake word '{detected_keyword}' detected")
                     # Clear buffer after detection to avoid re-triggering
                     self._audio_buffer = np.array([], dtype=np.int16)